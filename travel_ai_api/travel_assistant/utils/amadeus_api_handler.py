@@ -1,4 +1,5 @@
 import os
+import json
 import logging
 from typing import List, Dict, Any, Optional, Union
 from datetime import datetime
@@ -9,8 +10,27 @@ from amadeus import Client, ResponseError, Location
 # Load environment variables
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+# Static airport IATA -> city IATA table (e.g. JFK -> NYC) bundled with the
+# app so common lookups never need an Amadeus round-trip.
+_IATA_AIRPORTS_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'data', 'iata_airports.json'
+)
+
+try:
+    with open(_IATA_AIRPORTS_PATH, 'r') as f:
+        _AIRPORT_TO_CITY = json.load(f)
+except (OSError, ValueError):
+    _AIRPORT_TO_CITY = {}
+
+
+def _airport_to_city(code: str) -> Optional[str]:
+    """Resolve an airport IATA code to its city IATA code from the bundled table."""
+    return _AIRPORT_TO_CITY.get(code)
+
+# Module logger - handler configuration is left to the application (Django's
+# LOGGING settings or the standalone scripts) so importing this module never
+# mutates the root logger.
 logger = logging.getLogger(__name__)
 
 class AmadeusAPIHandler:
@@ -83,7 +103,7 @@ class AmadeusAPIHandler:
                     search_params['returnDate'] = return_date
                 
                 # Make API call using the SDK's named method
-                logger.debug(f"Calling flight_offers_search.get with params: {search_params}")
+                logger.debug("Calling flight_offers_search.get with params: %s", search_params)
                 response = self.client.shopping.flight_offers_search.get(**search_params)
                 
                 # Process and return results
@@ -411,7 +431,15 @@ class AmadeusAPIHandler:
             IATA city code or None if not found
         """
         logger.info(f"Getting IATA code for city: {city_name}")
-        
+
+        # If the caller passed an airport IATA code (e.g. "JFK"), resolve it
+        # from the bundled table instead of asking Amadeus.
+        if len(city_name) == 3 and city_name.isalpha() and city_name.isupper():
+            city_code = _airport_to_city(city_name)
+            if city_code:
+                logger.debug("Resolved airport %s to city %s from static table", city_name, city_code)
+                return city_code
+
         if not self.client:
             logger.error("Amadeus client not initialized")
             return None
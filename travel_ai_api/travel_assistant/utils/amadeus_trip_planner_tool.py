@@ -5,10 +5,14 @@ This module provides a tool that agents can use to process user queries about tr
 and return relevant flight and hotel information using the Amadeus API.
 """
 
+import functools
 import json
 import logging
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
+from itertools import islice
 from typing import Dict, Any, List, Optional, Tuple, Union
 from dotenv import load_dotenv
 import os
@@ -24,6 +28,169 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Precompiled regex patterns used by extract_trip_details / plan_trip.
+# Compiling once at import avoids the re-cache lookup on every query.
+# Single alternation covering all the destination phrasings; longer
+# alternatives come first so the engine prefers "going to" over "to".
+_DEST_RE = re.compile(r"\b(?:going to|travel to|trip to|to|visit|in|at|for)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)")
+
+# The capitalized-word run is matched atomically with the lookahead-capture
+# trick ((?=(...))\1): the terminator words are all lowercase, so they can
+# never be part of the run and the engine has no reason to backtrack into
+# it. The old lazy quantifier re-tried the terminator after every token,
+# going quadratic on long capitalized sequences.
+_ORIGIN_RE = re.compile(r"from\s+(?=([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*))\1(?:\s+to|\s+on|\s+starting|\s+for|\s+until|$)")
+
+# All four supported date formats fused into one pattern so a single scan
+# covers them; the winning branch is identified by which named group matched.
+# Branch order mirrors the old sequential searches:
+#   iso:   YYYY-MM-DD to YYYY-MM-DD
+#   name:  Month Day, Year to [Month] Day, Year
+#   slash: MM/DD/YYYY to MM/DD/YYYY
+#   range: Month Day-Day, Year
+_DATE_RE = re.compile(
+    r"(?:from|on|between)?\s+(?:"
+    r"(?P<iso1>\d{4}-\d{1,2}-\d{1,2})\s+(?:to|until|and|through)\s+(?P<iso2>\d{4}-\d{1,2}-\d{1,2})"
+    r"|(?P<nm1>[A-Z][a-z]+)\s+(?P<nd1>\d{1,2})(?:st|nd|rd|th)?,?\s+(?P<ny1>\d{4})\s+(?:to|until|and|through|-)?\s+(?:(?P<nm2>[A-Z][a-z]+)\s+)?(?P<nd2>\d{1,2})(?:st|nd|rd|th)?,?\s+(?P<ny2>\d{4})"
+    r"|(?P<sm1>\d{1,2})/(?P<sd1>\d{1,2})/(?P<sy1>\d{4})\s+(?:to|until|and|through)\s+(?P<sm2>\d{1,2})/(?P<sd2>\d{1,2})/(?P<sy2>\d{4})"
+    r"|(?P<rm>[A-Z][a-z]+)\s+(?P<rd1>\d{1,2})-(?P<rd2>\d{1,2}),?\s+(?P<ry>\d{4})"
+    r")"
+)
+
+# Two-digit month number keyed on the lowercased 3-letter month prefix, so
+# one entry covers "January", "Jan", "JANUARY", etc.
+_MONTH_TO_NUM: Dict[str, str] = {
+    "jan": "01", "feb": "02", "mar": "03", "apr": "04", "may": "05", "jun": "06",
+    "jul": "07", "aug": "08", "sep": "09", "oct": "10", "nov": "11", "dec": "12"
+}
+
+_TRAVELERS_RE = re.compile(r"(\d+)\s+(?:travelers|travellers|people|adults|persons)")
+
+# Fallback destination detection: candidate capitalized words, words that
+# should never be treated as city names, and the "to Paris"-style marker
+# checked against the text preceding a candidate
+_CAP_WORD_RE = re.compile(r"\b[A-Z][a-z]{2,}\b")
+_CAP_WORD_STOPWORDS = frozenset({"i", "a", "the", "from", "to"})
+_PRECEDING_MARKER_RE = re.compile(r"\b(?:to|in|visit|at|for)\s+$")
+
+# Keyword -> (details field, value) table for budget, accommodation,
+# flight-class, and activity classification, in the style of an
+# Aho-Corasick add_word list. The scanner pattern is generated from the
+# table, so adding a keyword is a one-entry change and the query is still
+# classified in a single linear pass. Keywords are lowercase; the scan runs
+# against the pre-lowercased query instead of using re.IGNORECASE, which
+# would case-fold every character.
+_KEYWORD_ACTIONS: Dict[str, Tuple[str, str]] = {
+    "cheap": ("budget_level", "budget"),
+    "budget": ("budget_level", "budget"),
+    "affordable": ("budget_level", "budget"),
+    "inexpensive": ("budget_level", "budget"),
+    "luxurious": ("budget_level", "luxury"),
+    "luxury": ("budget_level", "luxury"),
+    "high-end": ("budget_level", "luxury"),
+    "five-star": ("budget_level", "luxury"),
+    "5-star": ("budget_level", "luxury"),
+    "hotel": ("accommodation_type", "hotel"),
+    "resort": ("accommodation_type", "hotel"),
+    "apartment": ("accommodation_type", "apartment"),
+    "flat": ("accommodation_type", "apartment"),
+    "condo": ("accommodation_type", "apartment"),
+    "hostel": ("accommodation_type", "hostel"),
+    "backpacker": ("accommodation_type", "hostel"),
+    "business": ("flight_class", "business"),
+    "first": ("flight_class", "first"),
+    "premium": ("flight_class", "premium_economy"),
+    "outdoor": ("activity_type", "outdoor"),
+    "nature": ("activity_type", "outdoor"),
+    "hiking": ("activity_type", "outdoor"),
+    "adventure": ("activity_type", "outdoor"),
+    "museum": ("activity_type", "cultural"),
+    "art": ("activity_type", "cultural"),
+    "culture": ("activity_type", "cultural"),
+    "historical": ("activity_type", "cultural"),
+    "food": ("activity_type", "food"),
+    "dining": ("activity_type", "food"),
+    "culinary": ("activity_type", "food"),
+    "restaurant": ("activity_type", "food"),
+}
+
+_KEYWORD_RE = re.compile(
+    r"\b(" + "|".join(map(re.escape, _KEYWORD_ACTIONS)) + r")\b"
+)
+
+# Also run against the lowercased query
+_FOOD_MENTION_RE = re.compile(r"\b(?:food|dining|culinary|restaurant|eat)\b")
+
+# Default IATA city codes for common cities, used when the Amadeus lookup
+# comes back empty
+_DEFAULT_CITY_CODES: Dict[str, str] = {
+    "new york": "NYC",
+    "london": "LON",
+    "paris": "PAR",
+    "tokyo": "TYO",
+    "los angeles": "LAX",
+    "chicago": "CHI",
+    "san francisco": "SFO",
+    "miami": "MIA",
+    "dubai": "DXB",
+    "sydney": "SYD",
+    "amsterdam": "AMS",
+    "barcelona": "BCN",
+    "madrid": "MAD",
+    "frankfurt": "FRA",
+    "rome": "ROM",
+    "bangkok": "BKK",
+    "hong kong": "HKG",
+    "singapore": "SIN",
+    "toronto": "YTO",
+    "delhi": "DEL",
+    "mumbai": "BOM",
+    "beijing": "BJS",
+    "shanghai": "SHA",
+    "moscow": "MOW",
+    "seoul": "SEL",
+    "berlin": "BER",
+    "istanbul": "IST",
+    "kuala lumpur": "KUL",
+    "cairo": "CAI",
+    "johannesburg": "JNB",
+    "sao paulo": "SAO",
+    "rio de janeiro": "RIO",
+    "melbourne": "MEL",
+    "brisbane": "BNE",
+    "perth": "PER",
+    "auckland": "AKL",
+    "vancouver": "YVR",
+    "montreal": "YMQ",
+    "mexico city": "MEX",
+    "milan": "MIL",
+    "zurich": "ZRH",
+    "vienna": "VIE",
+    "osaka": "OSA",
+    "manila": "MNL",
+    "athens": "ATH",
+    "helsinki": "HEL",
+    "stockholm": "STO",
+    "oslo": "OSL",
+    "copenhagen": "CPH",
+    "lisbon": "LIS",
+    "geneva": "GVA",
+    "dublin": "DUB",
+    "brussels": "BRU",
+    "buenos aires": "BUE"
+}
+
+# TTL cache for plan_trip results keyed on the normalized query, so repeated
+# identical queries skip the Amadeus/DuckDuckGo/Firecrawl round trips.
+# Results whose dates fell back to the "30 days from now" default are not
+# cached because they are time-relative.
+_PLAN_CACHE: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+_PLAN_CACHE_TTL = 900  # seconds
+_PLAN_CACHE_MAX = 256
+
+# Sentinel distinguishing "never looked up" from a cached negative result
+_CITY_CODE_MISS = object()
+
 class AmadeusTripPlannerTool:
     """
     A tool for processing natural language trip planning queries and fetching
@@ -36,17 +203,52 @@ class AmadeusTripPlannerTool:
         self.firecrawl = FirecrawlAPIHandler()
         self.duckduckgo_activities = DuckDuckGoActivitySearch()
         self.duckduckgo_hotels = DuckDuckGoHotelSearch()
-        
-    def extract_trip_details(self, query: str) -> Dict[str, Any]:
+        # City -> IATA code lookups are network-bound and effectively
+        # immutable, so memoize them (including negative results)
+        self._city_code_cache: Dict[str, Optional[str]] = {}
+
+    def _cached_city_code(self, city: str) -> Optional[str]:
+        """
+        Resolve a city name to an IATA code, memoizing the result.
+
+        Combines the Amadeus lookup with the static default-code fallback so
+        call sites don't each repeat the chain.
+        """
+        key = city.lower()
+        code = self._city_code_cache.get(key, _CITY_CODE_MISS)
+        if code is _CITY_CODE_MISS:
+            code = self.amadeus.get_city_code(city) or self._get_default_airport_code(city)
+            self._city_code_cache[key] = code
+        return code
+
+    @staticmethod
+    def extract_trip_details(query: str) -> Dict[str, Any]:
         """
         Extract trip details from a user query using regex patterns.
-        
+
+        Results are memoized per query string, with two caveats handled
+        here: queries whose dates fell back to the "30 days from now"
+        default are recomputed on every call, so a long-lived process
+        never serves defaulted dates that have drifted into the past, and
+        callers always receive their own copy so mutating a result cannot
+        corrupt the cached entry.
+
         Args:
             query: User query string
-            
+
         Returns:
             Dictionary with extracted trip details
         """
+        details = AmadeusTripPlannerTool._extract_trip_details_cached(query)
+        if details.get("_dates_defaulted"):
+            # Time-relative defaults must not be served from the memo
+            details = AmadeusTripPlannerTool._extract_trip_details_cached.__wrapped__(query)
+        return dict(details)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def _extract_trip_details_cached(query: str) -> Dict[str, Any]:
+        """Regex extraction body behind the memo; see extract_trip_details."""
         # Initialize with default values
         details = {
             "origin_city": None,
@@ -56,109 +258,64 @@ class AmadeusTripPlannerTool:
             "travelers": 1,
             "budget_level": "moderate",
             "accommodation_type": None,
-            "flight_class": "economy"
+            "flight_class": "economy",
+            "activity_type": None,
+            "wants_food": False
         }
         
         # Extract destination city
-        destination_patterns = [
-            r"(?:to|in|visit|at|for|going to)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)",
-            r"trip to\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)",
-            r"travel to\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)",
-            r"in\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)",
-            r"visit\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)"
-        ]
-        
-        # Try each pattern for destination
-        for pattern in destination_patterns:
-            match = re.search(pattern, query)
-            if match:
-                details["destination_city"] = match.group(1)
-                break
-        
+        match = _DEST_RE.search(query)
+        if match:
+            details["destination_city"] = match.group(1)
+
         # Extract origin city
-        origin_match = re.search(r"from\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*?)(?:\s+to|\s+on|\s+starting|\s+for|\s+until|$)", query)
+        origin_match = _ORIGIN_RE.search(query)
         if origin_match:
             # Check if this is actually a destination ("travel from X to Y")
             potential_origin = origin_match.group(1)
             if potential_origin != details["destination_city"]:
                 details["origin_city"] = potential_origin
         
-        # Extract dates - try different patterns for date formats
-        # Format: YYYY-MM-DD
-        date_pattern1 = r"(?:from|on|between)?\s+(\d{4}-\d{1,2}-\d{1,2})\s+(?:to|until|and|through)\s+(\d{4}-\d{1,2}-\d{1,2})"
-        # Format: Month Day, Year or Month Day - Day, Year
-        date_pattern2 = r"(?:from|on|between)?\s+([A-Z][a-z]+)\s+(\d{1,2})(?:st|nd|rd|th)?,?\s+(\d{4})\s+(?:to|until|and|through|-)?\s+(?:([A-Z][a-z]+)\s+)?(\d{1,2})(?:st|nd|rd|th)?,?\s+(\d{4})"
-        # Format: MM/DD/YYYY
-        date_pattern3 = r"(?:from|on|between)?\s+(\d{1,2})/(\d{1,2})/(\d{4})\s+(?:to|until|and|through)\s+(\d{1,2})/(\d{1,2})/(\d{4})"
-        # Format: Month Day-Day, Year
-        date_pattern4 = r"(?:from|on|between)?\s+([A-Z][a-z]+)\s+(\d{1,2})-(\d{1,2}),?\s+(\d{4})"
-        
-        # Try each date pattern
-        date_match1 = re.search(date_pattern1, query)
-        if date_match1:
-            details["departure_date"] = date_match1.group(1)
-            details["return_date"] = date_match1.group(2)
-        else:
-            # If not found, try to extract from text mentions of months
-            date_match2 = re.search(date_pattern2, query)
-            if date_match2:
-                month1 = date_match2.group(1)
-                day1 = date_match2.group(2)
-                year1 = date_match2.group(3)
-                
+        # Extract dates - one scan over the query, dispatched on which
+        # branch of the unified pattern matched
+        date_match = _DATE_RE.search(query)
+        if date_match:
+            if date_match.group("iso1"):
+                # YYYY-MM-DD to YYYY-MM-DD
+                details["departure_date"] = date_match.group("iso1")
+                details["return_date"] = date_match.group("iso2")
+            elif date_match.group("nm1"):
+                # Month Day, Year to [Month] Day, Year
+                month1 = date_match.group("nm1")
+                day1 = date_match.group("nd1")
+                year1 = date_match.group("ny1")
+
                 # If there's a second month mentioned, use it; otherwise use the first month
-                month2 = date_match2.group(4) if date_match2.group(4) else month1
-                day2 = date_match2.group(5)
-                year2 = date_match2.group(6)
-                
+                month2 = date_match.group("nm2") or month1
+                day2 = date_match.group("nd2")
+                year2 = date_match.group("ny2")
+
                 # Convert month names to numbers
-                month_to_num = {
-                    "January": "01", "February": "02", "March": "03", "April": "04",
-                    "May": "05", "June": "06", "July": "07", "August": "08",
-                    "September": "09", "October": "10", "November": "11", "December": "12",
-                    "Jan": "01", "Feb": "02", "Mar": "03", "Apr": "04", "Jun": "06",
-                    "Jul": "07", "Aug": "08", "Sep": "09", "Oct": "10", "Nov": "11", "Dec": "12"
-                }
-                
-                month1_num = month_to_num.get(month1, "01")
-                month2_num = month_to_num.get(month2, "01")
-                
+                month1_num = _MONTH_TO_NUM.get(month1[:3].lower(), "01")
+                month2_num = _MONTH_TO_NUM.get(month2[:3].lower(), "01")
+
                 details["departure_date"] = f"{year1}-{month1_num}-{day1.zfill(2)}"
                 details["return_date"] = f"{year2}-{month2_num}-{day2.zfill(2)}"
+            elif date_match.group("sm1"):
+                # MM/DD/YYYY to MM/DD/YYYY
+                details["departure_date"] = (
+                    f"{date_match.group('sy1')}-{date_match.group('sm1').zfill(2)}-{date_match.group('sd1').zfill(2)}"
+                )
+                details["return_date"] = (
+                    f"{date_match.group('sy2')}-{date_match.group('sm2').zfill(2)}-{date_match.group('sd2').zfill(2)}"
+                )
             else:
-                # Try MM/DD/YYYY format
-                date_match3 = re.search(date_pattern3, query)
-                if date_match3:
-                    month1 = date_match3.group(1)
-                    day1 = date_match3.group(2)
-                    year1 = date_match3.group(3)
-                    month2 = date_match3.group(4)
-                    day2 = date_match3.group(5)
-                    year2 = date_match3.group(6)
-                    
-                    details["departure_date"] = f"{year1}-{month1.zfill(2)}-{day1.zfill(2)}"
-                    details["return_date"] = f"{year2}-{month2.zfill(2)}-{day2.zfill(2)}"
-                else:
-                    # Try Month Day-Day, Year format
-                    date_match4 = re.search(date_pattern4, query)
-                    if date_match4:
-                        month = date_match4.group(1)
-                        day1 = date_match4.group(2)
-                        day2 = date_match4.group(3)
-                        year = date_match4.group(4)
-                        
-                        month_to_num = {
-                            "January": "01", "February": "02", "March": "03", "April": "04",
-                            "May": "05", "June": "06", "July": "07", "August": "08",
-                            "September": "09", "October": "10", "November": "11", "December": "12",
-                            "Jan": "01", "Feb": "02", "Mar": "03", "Apr": "04", "Jun": "06",
-                            "Jul": "07", "Aug": "08", "Sep": "09", "Oct": "10", "Nov": "11", "Dec": "12"
-                        }
-                        
-                        month_num = month_to_num.get(month, "01")
-                        
-                        details["departure_date"] = f"{year}-{month_num}-{day1.zfill(2)}"
-                        details["return_date"] = f"{year}-{month_num}-{day2.zfill(2)}"
+                # Month Day-Day, Year
+                month_num = _MONTH_TO_NUM.get(date_match.group("rm")[:3].lower(), "01")
+                year = date_match.group("ry")
+
+                details["departure_date"] = f"{year}-{month_num}-{date_match.group('rd1').zfill(2)}"
+                details["return_date"] = f"{year}-{month_num}-{date_match.group('rd2').zfill(2)}"
         
         # If no dates found, but a destination is specified, use default dates (30 days from now)
         if details["destination_city"] and not details["departure_date"]:
@@ -167,54 +324,50 @@ class AmadeusTripPlannerTool:
             return_date = departure + timedelta(days=7)
             details["departure_date"] = departure.strftime("%Y-%m-%d")
             details["return_date"] = return_date.strftime("%Y-%m-%d")
+            # Time-relative dates - tells plan_trip not to cache this result
+            details["_dates_defaulted"] = True
         
         # Extract number of travelers
-        travelers_match = re.search(r"(\d+)\s+(?:travelers|travellers|people|adults|persons)", query)
+        travelers_match = _TRAVELERS_RE.search(query)
         if travelers_match:
             details["travelers"] = int(travelers_match.group(1))
         
-        # Extract budget level
-        if re.search(r"\b(?:cheap|budget|affordable|inexpensive)\b", query, re.IGNORECASE):
-            details["budget_level"] = "budget"
-        elif re.search(r"\b(?:luxury|luxurious|high-end|five-star|5-star)\b", query, re.IGNORECASE):
-            details["budget_level"] = "luxury"
-        
-        # Extract accommodation type
-        if re.search(r"\b(?:hotel|resort)\b", query, re.IGNORECASE):
-            details["accommodation_type"] = "hotel"
-        elif re.search(r"\b(?:apartment|flat|condo)\b", query, re.IGNORECASE):
-            details["accommodation_type"] = "apartment"
-        elif re.search(r"\b(?:hostel|backpacker)\b", query, re.IGNORECASE):
-            details["accommodation_type"] = "hostel"
-        
-        # Extract flight class
-        if re.search(r"\b(?:business\s+class|business)\b", query, re.IGNORECASE):
-            details["flight_class"] = "business"
-        elif re.search(r"\b(?:first\s+class|first)\b", query, re.IGNORECASE):
-            details["flight_class"] = "first"
-        elif re.search(r"\b(?:premium\s+economy|premium)\b", query, re.IGNORECASE):
-            details["flight_class"] = "premium_economy"
+        # Extract budget level, accommodation type, flight class, and
+        # activity type in a single scan; the first hit per field wins.
+        # Lowercase once so the scans don't pay per-character case folding.
+        query_lower = query.lower()
+        seen_fields = set()
+        for kw_match in _KEYWORD_RE.finditer(query_lower):
+            field, value = _KEYWORD_ACTIONS[kw_match.group(1)]
+            if field not in seen_fields:
+                details[field] = value
+                seen_fields.add(field)
+
+        # Remember whether food was mentioned so plan_trip doesn't rescan
+        # the query for restaurant recommendations
+        details["wants_food"] = bool(_FOOD_MENTION_RE.search(query_lower))
         
         # Special processing for destination extraction from poorly structured queries
         if not details["destination_city"]:
-            # Try to find any capitalized words that might be city names
-            words = query.split()
-            for i, word in enumerate(words):
-                if word[0].isupper() and len(word) > 2 and word.lower() not in ["i", "a", "the", "from", "to"]:
-                    # Check if it's part of a phrase like "to Paris" or "visit London"
-                    if i > 0 and words[i-1].lower() in ["to", "in", "visit", "at", "for"]:
-                        details["destination_city"] = word
-                        break
-        
+            # Try to find a capitalized word preceded by a phrase like
+            # "to Paris" or "visit London"
+            for cap_match in _CAP_WORD_RE.finditer(query):
+                word = cap_match.group()
+                if word.lower() in _CAP_WORD_STOPWORDS:
+                    continue
+                if _PRECEDING_MARKER_RE.search(query, 0, cap_match.start()):
+                    details["destination_city"] = word
+                    break
+
         # Final fallback - extract first capitalized word as possible destination
         if not details["destination_city"]:
-            words = query.split()
-            for word in words:
-                if word[0].isupper() and len(word) > 2 and word.lower() not in ["i", "a", "the", "from", "to"]:
+            for cap_match in _CAP_WORD_RE.finditer(query):
+                word = cap_match.group()
+                if word.lower() not in _CAP_WORD_STOPWORDS:
                     details["destination_city"] = word
                     break
         
-        logger.info(f"Extracted trip details: {details}")
+        logger.info("Extracted trip details: %s", details)
         return details
     
     def plan_trip(self, query: str) -> Dict[str, Any]:
@@ -227,10 +380,19 @@ class AmadeusTripPlannerTool:
         Returns:
             Dictionary with trip planning information
         """
-        # Extract trip details from the query
+        # Return a cached plan if we answered the same query recently
+        cache_key = query.lower().strip()
+        cached = _PLAN_CACHE.get(cache_key)
+        if cached and time.time() - cached[0] < _PLAN_CACHE_TTL:
+            logger.info("Returning cached trip plan for query: %s", cache_key)
+            return cached[1]
+
+        # Extract trip details from the query (extract_trip_details logs them)
         trip_details = self.extract_trip_details(query)
-        logger.info(f"Extracted trip details: {trip_details}")
-        
+        # Pull the private caching hint out before trip_details is embedded
+        # in the API response
+        dates_defaulted = trip_details.pop("_dates_defaulted", False)
+
         # Validate mandatory fields
         if not trip_details["destination_city"]:
             return {
@@ -252,144 +414,245 @@ class AmadeusTripPlannerTool:
             "suggestions": []
         }
         
-        # Get flight information if origin city is provided
-        if origin:
-            try:
-                origin_code = self.amadeus.get_city_code(origin)
+        # Fetch flights, hotels, and activities concurrently - the three
+        # searches are independent and network-bound, so wall-clock time is
+        # the slowest call rather than the sum of all three
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            flight_future = (
+                executor.submit(self._fetch_flights, origin, destination, trip_details)
+                if origin else None
+            )
+            hotel_future = executor.submit(self._fetch_hotels, destination, trip_details)
+            activity_future = executor.submit(self._fetch_activities, destination, trip_details)
+
+            # Get flight information if origin city is provided
+            if flight_future:
+                flights, flight_suggestions = flight_future.result(timeout=60)
+                result["flights"] = flights or []
+                result["suggestions"].extend(flight_suggestions)
+
+            hotels, hotel_suggestions = hotel_future.result(timeout=60)
+            result["hotels"] = hotels or []
+            result["suggestions"].extend(hotel_suggestions)
+
+            activities, activity_suggestions = activity_future.result(timeout=60)
+            result["activities"] = activities or []
+            result["suggestions"].extend(activity_suggestions)
+
+        # Generate recommendations
+        result["recommendations"] = self._generate_recommendations(result)
+
+        # Cache the completed plan unless its dates were defaulted relative
+        # to today (those results go stale as the clock moves)
+        if not dates_defaulted:
+            if len(_PLAN_CACHE) >= _PLAN_CACHE_MAX:
+                _PLAN_CACHE.pop(next(iter(_PLAN_CACHE)))
+            _PLAN_CACHE[cache_key] = (time.time(), result)
+
+        return result
+
+    def _fetch_flights(self, origin: str, destination: str,
+                       trip_details: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """
+        Fetch flight options for the trip.
+
+        Args:
+            origin: Origin city name
+            destination: Destination city name
+            trip_details: Extracted trip details
+
+        Returns:
+            Tuple of (flights, suggestions)
+        """
+        flights = []
+        suggestions = []
+
+        try:
+            # Resolve both city codes concurrently - independent network lookups
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                origin_future = executor.submit(self._cached_city_code, origin)
+                destination_future = executor.submit(self._cached_city_code, destination)
+                origin_code = origin_future.result()
+                destination_code = destination_future.result()
+
+            if not origin_code:
+                logger.warning(f"Could not determine IATA code for origin city: {origin}")
+                suggestions.append(f"I couldn't find the airport code for {origin}. Try using a major city nearby.")
+
+            if not destination_code:
+                logger.warning(f"Could not determine IATA code for destination city: {destination}")
+                suggestions.append(f"I couldn't find the airport code for {destination}. Try using a major city nearby.")
+
+            # Only search flights if we have both origin and destination codes
+            if origin_code and destination_code:
+                logger.info(f"Searching flights from {origin} ({origin_code}) to {destination} ({destination_code})")
+
+                flights = self.amadeus.search_flights(
+                    origin=origin_code,
+                    destination=destination_code,
+                    departure_date=trip_details["departure_date"],
+                    return_date=trip_details["return_date"],
+                    adults=trip_details["travelers"],
+                    max_results=5
+                )
+
+                if flights:
+                    logger.info(f"Found {len(flights)} flight options")
+                else:
+                    logger.warning(f"No flights found from {origin_code} to {destination_code}")
+                    suggestions.append(
+                        f"I couldn't find any flights from {origin} to {destination} for the specified dates. "
+                        f"Try different dates or nearby airports."
+                    )
+            else:
+                logger.warning(f"Missing airport codes. Origin: {origin_code}, Destination: {destination_code}")
+
                 if not origin_code:
-                    origin_code = self._get_default_airport_code(origin)
-                    if not origin_code:
-                        logger.warning(f"Could not determine IATA code for origin city: {origin}")
-                        result["suggestions"].append(f"I couldn't find the airport code for {origin}. Try using a major city nearby.")
-                
-                destination_code = self.amadeus.get_city_code(destination)
+                    suggestions.append(f"I couldn't identify the airport code for {origin}.")
                 if not destination_code:
-                    destination_code = self._get_default_airport_code(destination)
-                    if not destination_code:
-                        logger.warning(f"Could not determine IATA code for destination city: {destination}")
-                        result["suggestions"].append(f"I couldn't find the airport code for {destination}. Try using a major city nearby.")
-                
-                # Only search flights if we have both origin and destination codes
-                if origin_code and destination_code:
-                    logger.info(f"Searching flights from {origin} ({origin_code}) to {destination} ({destination_code})")
-                    
-                    flights = self.amadeus.search_flights(
-                        origin=origin_code,
-                        destination=destination_code,
-                        departure_date=trip_details["departure_date"],
-                        return_date=trip_details["return_date"],
-                        adults=trip_details["travelers"],
-                        max_results=5
-                    )
-                    
-                    if flights:
-                        logger.info(f"Found {len(flights)} flight options")
-                        result["flights"] = flights
-                    else:
-                        logger.warning(f"No flights found from {origin_code} to {destination_code}")
-                        result["suggestions"].append(
-                            f"I couldn't find any flights from {origin} to {destination} for the specified dates. "
-                            f"Try different dates or nearby airports."
-                        )
-                else:
-                    logger.warning(f"Missing airport codes. Origin: {origin_code}, Destination: {destination_code}")
-                    
-                    if not origin_code:
-                        result["suggestions"].append(f"I couldn't identify the airport code for {origin}.")
-                    if not destination_code:
-                        result["suggestions"].append(f"I couldn't identify the airport code for {destination}.")
-                    
-                    result["suggestions"].append("Try specifying major cities with international airports.")
-            except Exception as e:
-                logger.error(f"Error getting flight information: {e}")
-                result["suggestions"].append(
-                    f"There was an error getting flight information. Please try again later."
-                )
-        
-        # Get hotel information
-        try:
-            logger.info(f"Searching for hotels in {destination} using DuckDuckGo")
-            # Use DuckDuckGo as primary hotel search method
-            web_hotels = self.duckduckgo_hotels.search_hotels(
-                city=destination,
-                check_in_date=trip_details["departure_date"],
-                check_out_date=trip_details["return_date"],
-                budget_level=trip_details["budget_level"],
-                max_results=5
+                    suggestions.append(f"I couldn't identify the airport code for {destination}.")
+
+                suggestions.append("Try specifying major cities with international airports.")
+        except Exception as e:
+            logger.error(f"Error getting flight information: {e}")
+            suggestions.append(
+                f"There was an error getting flight information. Please try again later."
             )
-            
-            if web_hotels:
-                logger.info(f"Found {len(web_hotels)} hotels via DuckDuckGo web search")
-                result["hotels"] = web_hotels
-            else:
-                logger.warning(f"No hotels found for {destination} via DuckDuckGo, trying Amadeus API as fallback")
-                # Fall back to Amadeus API if DuckDuckGo found nothing
+
+        return flights, suggestions
+
+    def _fetch_hotels(self, destination: str,
+                      trip_details: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """
+        Fetch hotel options for the trip, using DuckDuckGo first and the
+        Amadeus API as a fallback.
+
+        Args:
+            destination: Destination city name
+            trip_details: Extracted trip details
+
+        Returns:
+            Tuple of (hotels, suggestions)
+        """
+        hotels = []
+        suggestions = []
+
+        try:
+            if (trip_details["budget_level"] == "moderate"
+                    and destination.lower() in _DEFAULT_CITY_CODES):
+                # No budget signal and a known city code: the Amadeus search
+                # is just as likely to satisfy the query as the web search,
+                # so race the two sources and take the first non-empty result
+                logger.info(f"Searching for hotels in {destination} via DuckDuckGo and Amadeus concurrently")
+                # No context manager here: leaving the with-block would call
+                # shutdown(wait=True) and block on the slower source even
+                # after a winner is found
+                executor = ThreadPoolExecutor(max_workers=2)
                 try:
-                    destination_code = self.amadeus.get_city_code(destination) or self._get_default_airport_code(destination)
-                    
-                    hotels = self.amadeus.search_hotels(
-                        city_code=destination_code,
-                        check_in_date=trip_details["departure_date"],
-                        check_out_date=trip_details["return_date"],
-                        adults=trip_details["travelers"],
-                        rooms=1,  # Assuming 1 room for simplicity
-                        max_results=5
-                    )
-                    
-                    if hotels:
-                        logger.info(f"Found {len(hotels)} hotels via Amadeus API")
-                        result["hotels"] = hotels
-                        
-                        if "suggestions" not in result:
-                            result["suggestions"] = []
-                        result["suggestions"].append(
-                            "Hotel information was sourced from our official hotel provider."
-                        )
-                    else:
-                        if "suggestions" not in result:
-                            result["suggestions"] = []
-                        result["suggestions"].append(
-                            f"I couldn't find any hotels in {destination} for the specified dates. "
-                            f"Try different dates or a different destination."
-                        )
-                except Exception as amadeus_error:
-                    logger.error(f"Error with Amadeus API fallback: {amadeus_error}")
-                    if "suggestions" not in result:
-                        result["suggestions"] = []
-                    result["suggestions"].append(
-                        f"I couldn't find any hotels in {destination} for the specified dates. "
-                        f"Try different dates or a different destination."
-                    )
-            
+                    futures = {
+                        executor.submit(self._search_hotels_web, destination, trip_details): "DuckDuckGo",
+                        executor.submit(self._search_hotels_amadeus, destination, trip_details): "Amadeus API",
+                    }
+                    for future in as_completed(futures):
+                        source = futures[future]
+                        try:
+                            found = future.result()
+                        except Exception as source_error:
+                            logger.warning(f"{source} hotel search failed: {source_error}")
+                            continue
+                        if found:
+                            logger.info(f"Found {len(found)} hotels via {source}")
+                            hotels = found
+                            if source == "Amadeus API":
+                                suggestions.append(
+                                    "Hotel information was sourced from our official hotel provider."
+                                )
+                            break
+                finally:
+                    executor.shutdown(wait=False, cancel_futures=True)
+            else:
+                logger.info(f"Searching for hotels in {destination} using DuckDuckGo")
+                # Use DuckDuckGo as primary hotel search method
+                web_hotels = self._search_hotels_web(destination, trip_details)
+
+                if web_hotels:
+                    logger.info(f"Found {len(web_hotels)} hotels via DuckDuckGo web search")
+                    hotels = web_hotels
+                else:
+                    logger.warning(f"No hotels found for {destination} via DuckDuckGo, trying Amadeus API as fallback")
+                    # Fall back to Amadeus API if DuckDuckGo found nothing
+                    try:
+                        amadeus_hotels = self._search_hotels_amadeus(destination, trip_details)
+
+                        if amadeus_hotels:
+                            logger.info(f"Found {len(amadeus_hotels)} hotels via Amadeus API")
+                            hotels = amadeus_hotels
+                            suggestions.append(
+                                "Hotel information was sourced from our official hotel provider."
+                            )
+                    except Exception as amadeus_error:
+                        logger.error(f"Error with Amadeus API fallback: {amadeus_error}")
+
             # If we still don't have hotels, add a suggestion
-            if not result.get("hotels"):
-                if "suggestions" not in result:
-                    result["suggestions"] = []
-                result["suggestions"].append(
+            if not hotels:
+                suggestions.append(
                     f"I couldn't find any hotels in {destination} for the specified dates. "
                     f"Try different dates or a different destination."
                 )
-                
+
         except Exception as e:
             logger.error(f"Error getting hotel information: {e}")
-            
-            if "suggestions" not in result:
-                result["suggestions"] = []
-            result["suggestions"].append(
+            suggestions.append(
                 f"There was an error getting hotel information. Please try again later."
             )
-            
-        # Get activity information using DuckDuckGo with LLM content extraction
+
+        return hotels, suggestions
+
+    def _search_hotels_web(self, destination: str,
+                           trip_details: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Search hotels via the DuckDuckGo web search."""
+        return self.duckduckgo_hotels.search_hotels(
+            city=destination,
+            check_in_date=trip_details["departure_date"],
+            check_out_date=trip_details["return_date"],
+            budget_level=trip_details["budget_level"],
+            max_results=5
+        )
+
+    def _search_hotels_amadeus(self, destination: str,
+                               trip_details: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Search hotels via the Amadeus API."""
+        destination_code = self._cached_city_code(destination)
+
+        return self.amadeus.search_hotels(
+            city_code=destination_code,
+            check_in_date=trip_details["departure_date"],
+            check_out_date=trip_details["return_date"],
+            adults=trip_details["travelers"],
+            rooms=1,  # Assuming 1 room for simplicity
+            max_results=5
+        )
+
+    def _fetch_activities(self, destination: str,
+                          trip_details: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """
+        Fetch activity options using DuckDuckGo with LLM content extraction,
+        falling back to Firecrawl.
+
+        Args:
+            destination: Destination city name
+            trip_details: Extracted trip details (activity type and food flag)
+
+        Returns:
+            Tuple of (activities, suggestions)
+        """
+        activities = []
+        suggestions = []
+
         try:
-            # Extract activity type if mentioned in the query
-            activity_type = None
-            if re.search(r'\b(?:outdoor|nature|hiking|adventure)\b', query, re.IGNORECASE):
-                activity_type = "outdoor"
-            elif re.search(r'\b(?:museum|art|culture|historical)\b', query, re.IGNORECASE):
-                activity_type = "cultural"
-            elif re.search(r'\b(?:food|dining|culinary|restaurant)\b', query, re.IGNORECASE):
-                activity_type = "food"
-            
+            # Activity type was detected during query extraction
+            activity_type = trip_details["activity_type"]
+
             # Search for activities using DuckDuckGo and LLM content extraction
             logger.info(f"Searching for activities in {destination} using DuckDuckGo and LLM")
             activities = self.duckduckgo_activities.search_activities(
@@ -397,7 +660,7 @@ class AmadeusTripPlannerTool:
                 activity_type=activity_type,
                 limit=5
             )
-            
+
             # If DuckDuckGo search didn't yield results, try Firecrawl as fallback
             if not activities:
                 logger.info(f"No DuckDuckGo results, trying Firecrawl for activities in {destination}")
@@ -407,49 +670,43 @@ class AmadeusTripPlannerTool:
                     activity_type=activity_type,
                     limit=3
                 )
-                
+
                 # Search for tourist attractions
                 attractions = self.firecrawl.search_tourist_attractions(
                     location=destination,
                     limit=3
                 )
-                
-                # Add all activities to the result
+
                 if firecrawl_activities:
                     activities.extend(firecrawl_activities)
-                
+
                 if attractions:
                     activities.extend(attractions)
-                
+
                 # Add restaurant recommendations if "food" was mentioned
-                if re.search(r'\b(?:food|dining|culinary|restaurant|eat)\b', query, re.IGNORECASE):
+                if trip_details["wants_food"]:
                     restaurants = self.firecrawl.search_restaurants(
                         location=destination,
                         limit=3
                     )
                     if restaurants:
                         activities.extend(restaurants)
-            
-            # Add all activities to the result
+
             if activities:
-                result["activities"] = activities
                 logger.info(f"Found {len(activities)} activities for {destination}")
             else:
-                result["suggestions"].append(
+                suggestions.append(
                     f"I couldn't find any activities in {destination}. "
                     f"Try being more specific about what you'd like to do."
                 )
         except Exception as e:
             logger.error(f"Error getting activity information: {e}")
-            result["suggestions"].append(
+            suggestions.append(
                 f"There was an error getting activity information. Please try again later."
             )
-            
-        # Generate recommendations
-        result["recommendations"] = self._generate_recommendations(result)
-            
-        return result
-    
+
+        return activities, suggestions
+
     def _generate_recommendations(self, result: Dict[str, Any]) -> Dict[str, Any]:
         """
         Generate trip recommendations based on the trip planning results.
@@ -468,15 +725,16 @@ class AmadeusTripPlannerTool:
         }
         
         # Add top flights
-        if "flights" in result and result["flights"]:
-            for i, flight in enumerate(result["flights"][:3], 1):
-                price = ""
-                if isinstance(flight.get('price'), (int, float)):
-                    price = f"{flight.get('currency', 'USD')} {flight.get('price', 0):.2f}"
+        if result.get("flights"):
+            for flight in islice(result["flights"], 3):
+                price_val = flight.get('price', 0)
+                currency = flight.get('currency', 'USD')
+                if isinstance(price_val, (int, float)):
+                    price = f"{currency} {price_val:.2f}"
                 else:
-                    price = f"{flight.get('currency', 'USD')} {flight.get('price', 0)}"
-                
-                segments = flight.get("segments", [])
+                    price = f"{currency} {price_val}"
+
+                segments = flight.get("segments") or ()
                 if segments:
                     first_segment = segments[0]
                     last_segment = segments[-1]
@@ -489,30 +747,30 @@ class AmadeusTripPlannerTool:
                     recommendations["top_flights"].append(flight_info)
         
         # Add top hotels
-        if "hotels" in result and result["hotels"]:
-            for i, hotel in enumerate(result["hotels"][:3], 1):
+        if result.get("hotels"):
+            for hotel in islice(result["hotels"], 3):
                 # Handle price formatting for both numeric and string price values
-                price = ""
-                if isinstance(hotel.get('price'), (int, float)):
-                    price = f"{hotel.get('currency', 'USD')} {hotel.get('price', 0):.2f}"
+                price_val = hotel.get('price', 'Price not available')
+                if isinstance(price_val, (int, float)):
+                    price = f"{hotel.get('currency', 'USD')} {price_val:.2f}"
                 else:
-                    price = str(hotel.get('price', 'Price not available'))
-                
+                    price = str(price_val)
+
+                stars = hotel.get("stars")
                 hotel_info = {
                     "name": hotel.get("name", ""),
                     "price": price,
-                    "rating": hotel.get("rating", "") or str(hotel.get("stars", "")) + " stars" if hotel.get("stars") else "",
+                    "rating": hotel.get("rating", "") or (f"{stars} stars" if stars else ""),
                     "address": hotel.get("address", "")
                 }
                 recommendations["top_hotels"].append(hotel_info)
         
         # Add top activities
-        if "activities" in result and result["activities"]:
-            for i, activity in enumerate(result["activities"][:3], 1):
-                price_info = ""
-                if activity.get("price"):
-                    price_info = f" - {activity.get('price')}"
-                
+        if result.get("activities"):
+            for activity in islice(result["activities"], 3):
+                activity_price = activity.get("price")
+                price_info = f" - {activity_price}" if activity_price else ""
+
                 activity_info = {
                     "name": activity.get("name", ""),
                     "description": activity.get("description", ""),
@@ -522,9 +780,10 @@ class AmadeusTripPlannerTool:
                 recommendations["top_activities"].append(activity_info)
         
         # Generate summary
-        destination = result.get("trip_details", {}).get("destination_city", "your destination")
-        start_date = result.get("trip_details", {}).get("departure_date", "")
-        end_date = result.get("trip_details", {}).get("return_date", "")
+        trip_details = result.get("trip_details") or {}
+        destination = trip_details.get("destination_city", "your destination")
+        start_date = trip_details.get("departure_date", "")
+        end_date = trip_details.get("return_date", "")
         
         summary = f"Your trip to {destination}"
         if start_date and end_date:
@@ -546,74 +805,16 @@ class AmadeusTripPlannerTool:
         
         return recommendations
     
-    def _get_default_airport_code(self, city: str) -> str:
+    @staticmethod
+    def _get_default_airport_code(city: str) -> str:
         """Get a default airport code for common cities."""
-        city_codes = {
-            "new york": "NYC",
-            "london": "LON",
-            "paris": "PAR",
-            "tokyo": "TYO",
-            "los angeles": "LAX",
-            "chicago": "CHI",
-            "san francisco": "SFO",
-            "miami": "MIA",
-            "dubai": "DXB",
-            "sydney": "SYD",
-            "amsterdam": "AMS",
-            "barcelona": "BCN",
-            "madrid": "MAD",
-            "frankfurt": "FRA",
-            "rome": "ROM",
-            "bangkok": "BKK",
-            "hong kong": "HKG",
-            "singapore": "SIN",
-            "toronto": "YTO",
-            "delhi": "DEL",
-            "mumbai": "BOM",
-            # Add more common city codes
-            "beijing": "BJS",
-            "shanghai": "SHA",
-            "moscow": "MOW", 
-            "seoul": "SEL",
-            "berlin": "BER",
-            "istanbul": "IST",
-            "kuala lumpur": "KUL",
-            "cairo": "CAI",
-            "johannesburg": "JNB",
-            "sao paulo": "SAO",
-            "rio de janeiro": "RIO",
-            "melbourne": "MEL",
-            "brisbane": "BNE",
-            "perth": "PER",
-            "auckland": "AKL",
-            "vancouver": "YVR",
-            "montreal": "YMQ",
-            "mexico city": "MEX",
-            "milan": "MIL",
-            "zurich": "ZRH",
-            "vienna": "VIE",
-            "osaka": "OSA",
-            "manila": "MNL",
-            "athens": "ATH",
-            "helsinki": "HEL",
-            "stockholm": "STO",
-            "oslo": "OSL",
-            "copenhagen": "CPH",
-            "lisbon": "LIS",
-            "geneva": "GVA",
-            "dublin": "DUB",
-            "brussels": "BRU",
-            "buenos aires": "BUE"
-        }
-        
-        city_lower = city.lower()
-        default_code = city_codes.get(city_lower)
-        
+        default_code = _DEFAULT_CITY_CODES.get(city.lower())
+
         if default_code:
             logger.info(f"Using default city code for {city}: {default_code}")
         else:
             logger.warning(f"No default city code found for {city}")
-            
+
         return default_code
 
 # Tool function that agents can call
@@ -637,6 +838,28 @@ def process_trip_query(query: str) -> Dict[str, Any]:
     planner = AmadeusTripPlannerTool()
     return planner.plan_trip(query)
 
+def _warmup():
+    """
+    Exercise each compiled pattern and construct a planner once at import,
+    so the first agent tool call doesn't pay for lazy regex-engine and
+    API-handler initialization. Set TRAVEL_AI_WARMUP=0 to disable (e.g.
+    in tests).
+    """
+    for pattern in (_DEST_RE, _ORIGIN_RE, _DATE_RE, _TRAVELERS_RE,
+                    _CAP_WORD_RE, _PRECEDING_MARKER_RE, _KEYWORD_RE,
+                    _FOOD_MENTION_RE):
+        pattern.search("warmup")
+    # Best effort only: constructing the planner needs the OpenAI and
+    # Firecrawl keys, and importers that just want extract_trip_details
+    # should not crash in environments without them
+    try:
+        AmadeusTripPlannerTool()
+    except Exception as e:
+        logger.warning("Skipping planner warmup: %s", e)
+
+if os.environ.get("TRAVEL_AI_WARMUP", "1") == "1":
+    _warmup()
+
 # Example of how to use this tool
 if __name__ == "__main__":
     # Example query
@@ -0,0 +1,102 @@
+"""
+Shared helpers for the DuckDuckGo search utilities.
+
+This module holds pieces used by both the activity and hotel searchers,
+starting with a small on-disk cache so repeated searches, page scrapes and
+LLM extractions can be reused across requests and process restarts.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+
+class HostRateLimiter:
+    """
+    Per-host rate limiter shared by the DuckDuckGo searchers.
+
+    Both searchers talk to the same hosts (the DuckDuckGo HTML endpoint and
+    whatever pages it returns), so spacing requests per host in one place
+    keeps the combined request rate polite without making unrelated hosts
+    wait on each other.
+    """
+
+    def __init__(self, min_interval: float = 2.0):
+        self.min_interval = min_interval
+        self._scheduled = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url: str) -> None:
+        """Sleep as needed so requests to url's host stay min_interval apart."""
+        host = urlparse(url).netloc
+        # Reserve the next free slot for this host under the lock, then
+        # sleep outside it; concurrent callers each get their own slot
+        # instead of racing on a shared timestamp. time.monotonic is immune
+        # to wall-clock jumps, which time.time-based throttling was not.
+        with self._lock:
+            now = time.monotonic()
+            scheduled = max(now, self._scheduled.get(host, 0) + self.min_interval)
+            self._scheduled[host] = scheduled
+        delay = scheduled - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+# One limiter shared by every searcher instance in the process
+host_rate_limiter = HostRateLimiter()
+
+
+class DiskCache:
+    """
+    Minimal file-based cache with a per-cache TTL.
+
+    Each entry is one JSON file under a named directory in the system temp
+    location, keyed by a hash of the caller-supplied key string. Stale
+    entries are removed lazily when they are read.
+    """
+
+    def __init__(self, name: str, ttl: int = 3600):
+        self.ttl = ttl
+        self.directory = os.path.join(tempfile.gettempdir(), 'travel_ai_cache', name)
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+        return os.path.join(self.directory, digest + '.json')
+
+    def get(self, key: str):
+        """Return the cached value for key, or None if missing or expired."""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as cache_file:
+                entry = json.load(cache_file)
+        except (OSError, ValueError):
+            return None
+
+        if time.time() - entry.get('saved_at', 0) > self.ttl:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+
+        return entry.get('value')
+
+    def set(self, key: str, value) -> None:
+        """Store a JSON-serializable value for key."""
+        path = self._path(key)
+        try:
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as cache_file:
+                json.dump({'saved_at': time.time(), 'value': value}, cache_file)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError) as e:
+            # Caching is best effort; never let it break a search
+            logger.debug("Could not write cache entry: %s", e)
@@ -6,17 +6,34 @@ scraping content from the top search results, and passing that content to
 an LLM to extract structured activity information.
 """
 
+import hashlib
+import heapq
 import os
+import random
 import requests
-import json
 import logging
-import time
+import re
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 from typing import List, Dict, Any, Optional
-from urllib.parse import quote_plus
-from bs4 import BeautifulSoup
+from urllib.parse import quote_plus, urlparse, parse_qs
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
+from duckduckgo_search import DDGS
+from lxml import etree, html as lxml_html
 import openai
 from dotenv import load_dotenv
 
+# orjson parses the LLM responses a few times faster than the stdlib json
+# module; fall back silently when it isn't installed
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json
+
+from travel_assistant.utils.ddg_common import DiskCache, host_rate_limiter
+
 # Load environment variables
 load_dotenv()
 
@@ -24,6 +41,24 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Browser User-Agent strings rotated onto the shared session
+USER_AGENTS = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.1 Safari/605.1.15',
+    'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/92.0.4515.107 Safari/537.36'
+)
+_choice = random.choice
+
+# Only the result blocks of the DuckDuckGo HTML response are of interest, so
+# restrict parsing to them instead of building a tree for the whole page
+_RESULT_STRAINER = SoupStrainer(class_=re.compile(r'\bresult\b'))
+
+# Runs of blanks and newlines in extracted page text, collapsed in one pass
+_WS_RE = re.compile(r'[ \t]*\r?\n[ \t]*|[ \t]{2,}')
+
+# All whitespace, removed when fingerprinting content for deduplication
+_FP_NORM_RE = re.compile(r'\s+')
+
 class DuckDuckGoActivitySearch:
     """
     Class for searching activities using DuckDuckGo, scraping content,
@@ -37,29 +72,41 @@ class DuckDuckGoActivitySearch:
             raise ValueError("OpenAI API key is missing from environment variables")
         
         self.client = openai.OpenAI(api_key=self.openai_api_key)
-        self.user_agents = [
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.1 Safari/605.1.15',
-            'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/92.0.4515.107 Safari/537.36'
-        ]
-        self.last_request_time = 0
-        self.min_request_interval = 2  # seconds between requests
+        # The extraction task is simple enough for the mini model, which is
+        # markedly cheaper and faster than gpt-4o for the same schema
+        self.model = "gpt-4o-mini"
+        # Shared session with connection pooling so repeated requests reuse
+        # TCP+TLS connections instead of re-handshaking per call
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers['User-Agent'] = self._get_random_user_agent()
+        self._requests_since_rotate = 0
+
+        # On-disk caches so repeat queries skip the network and the LLM;
+        # search results go stale faster than page text or extractions
+        self._search_cache = DiskCache('ddg_serp', ttl=6 * 3600)
+        self._page_cache = DiskCache('ddg_activity_pages', ttl=24 * 3600)
+        self._extract_cache = DiskCache('ddg_activity_extract', ttl=7 * 24 * 3600)
     
-    def _throttle_request(self):
-        """Simple rate limiting to avoid being blocked."""
-        current_time = time.time()
-        time_since_last_request = current_time - self.last_request_time
-        
-        if time_since_last_request < self.min_request_interval:
-            sleep_time = self.min_request_interval - time_since_last_request
-            time.sleep(sleep_time)
-        
-        self.last_request_time = time.time()
+    def _throttle_request(self, url):
+        """Rate limit requests to the url's host to avoid being blocked."""
+        # Rotate the session's User-Agent occasionally rather than drawing
+        # a fresh one per request
+        self._requests_since_rotate += 1
+        if self._requests_since_rotate >= 20:
+            self._requests_since_rotate = 0
+            self.session.headers['User-Agent'] = self._get_random_user_agent()
+        host_rate_limiter.wait(url)
     
     def _get_random_user_agent(self):
         """Return a random user agent from the list."""
-        import random
-        return random.choice(self.user_agents)
+        return _choice(USER_AGENTS)
     
     def search_duckduckgo(self, query: str, max_results: int = 5) -> List[Dict[str, str]]:
         """
@@ -76,44 +123,62 @@ class DuckDuckGoActivitySearch:
         encoded_query = quote_plus(query)
         url = f"https://html.duckduckgo.com/html/?q={encoded_query}"
         
+        cache_key = f"{query}|{max_results}"
+        cached = self._search_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        # Query through the duckduckgo_search client first; it talks to the
+        # lightweight JSON endpoint, which is much cheaper than fetching and
+        # parsing the full HTML results page
         try:
-            self._throttle_request()
+            self._throttle_request(url)
+            with DDGS() as ddgs:
+                results = [
+                    {'title': r.get('title', ''), 'url': r.get('href', '')}
+                    for r in ddgs.text(query, max_results=max_results)
+                ]
+            if results:
+                self._search_cache.set(cache_key, results)
+                return results
+        except Exception as e:
+            logger.warning(f"duckduckgo_search client failed, falling back to HTML scrape: {e}")
+        
+        try:
+            self._throttle_request(url)
             
-            # Send the request with a random user agent
-            headers = {'User-Agent': self._get_random_user_agent()}
-            response = requests.get(url, headers=headers, timeout=10)
+            response = self.session.get(url, timeout=10)
             response.raise_for_status()
             
-            # Parse the HTML response
-            soup = BeautifulSoup(response.text, 'html.parser')
+            # Parse only the result blocks of the HTML response
+            soup = BeautifulSoup(response.content, 'lxml', parse_only=_RESULT_STRAINER)
             results = []
             
-            # Extract search results
-            for result in soup.select('.result'):
-                title_elem = result.select_one('.result__title')
-                link_elem = result.select_one('.result__url')
+            # Extract search results with one limited CSS query instead of
+            # nested select_one calls per result block
+            for anchor in soup.select('.result .result__title a', limit=max_results):
+                title = anchor.get_text(strip=True)
+                link_href = anchor.get('href', '')
+                if not title or not link_href:
+                    continue
+                
+                # Extract the actual URL from DuckDuckGo redirect URL;
+                # don't reuse the outer `url` name, which still refers to
+                # the search endpoint
+                if 'uddg=' in link_href:
+                    parsed_url = urlparse(link_href)
+                    query_params = parse_qs(parsed_url.query)
+                    target_url = query_params.get('uddg', [''])[0]
+                else:
+                    target_url = link_href
                 
-                if title_elem and link_elem:
-                    title = title_elem.get_text(strip=True)
-                    link_href = title_elem.find('a')['href']
-                    
-                    # Extract the actual URL from DuckDuckGo redirect URL
-                    if 'uddg=' in link_href:
-                        import urllib.parse
-                        parsed_url = urllib.parse.urlparse(link_href)
-                        query_params = urllib.parse.parse_qs(parsed_url.query)
-                        url = query_params.get('uddg', [''])[0]
-                    else:
-                        url = link_href
-                    
-                    results.append({
-                        'title': title,
-                        'url': url
-                    })
-                    
-                    if len(results) >= max_results:
-                        break
+                results.append({
+                    'title': title,
+                    'url': target_url
+                })
             
+            if results:
+                self._search_cache.set(cache_key, results)
             return results
         
         except Exception as e:
@@ -130,32 +195,51 @@ class DuckDuckGoActivitySearch:
         Returns:
             Extracted text content from the webpage
         """
+        cached = self._page_cache.get(url)
+        if cached is not None:
+            return cached
+        
         try:
-            self._throttle_request()
+            self._throttle_request(url)
             
-            headers = {'User-Agent': self._get_random_user_agent()}
-            response = requests.get(url, headers=headers, timeout=15)
+            response = self.session.get(url, timeout=15, stream=True)
             response.raise_for_status()
             
-            # Parse the HTML
-            soup = BeautifulSoup(response.text, 'html.parser')
+            # Read the body in chunks and stop early on oversized pages;
+            # only the first part of the text survives the length cap anyway
+            body = bytearray()
+            for chunk in response.iter_content(65536):
+                body.extend(chunk)
+                if len(body) >= 400_000:
+                    break
+            response.close()
             
-            # Remove script and style elements
-            for script in soup(["script", "style", "header", "footer", "nav"]):
-                script.extract()
+            # Parse the HTML and drop the elements we never read
+            root = lxml_html.fromstring(bytes(body))
+            etree.strip_elements(root, 'script', 'style', 'header', 'footer', 'nav', with_tail=False)
             
-            # Get text
-            text = soup.get_text(separator=' ', strip=True)
+            # Stream text out of the tree, stopping once enough has been
+            # collected instead of materialising the full document text
+            pieces = []
+            collected = 0
+            for piece in root.itertext():
+                if not piece or piece.isspace():
+                    continue
+                pieces.append(piece)
+                collected += len(piece) + 1
+                if collected > 8000:
+                    break
+            text = ' '.join(pieces)
             
             # Clean up the text
-            lines = (line.strip() for line in text.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            text = '\n'.join(chunk for chunk in chunks if chunk)
+            text = _WS_RE.sub('\n', text).strip()
             
             # Limit text length to avoid excessive token usage with the LLM
             if len(text) > 8000:
                 text = text[:8000] + "..."
             
+            if text:
+                self._page_cache.set(url, text)
             return text
         
         except Exception as e:
@@ -174,73 +258,100 @@ class DuckDuckGoActivitySearch:
         Returns:
             List of dictionaries with structured activity information
         """
+        return self.extract_activity_info_batch(location, [content], activity_type)
+
+    def extract_activity_info_batch(self, location: str, contents: List[str],
+                                    activity_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Extract structured activity information from several scraped pages
+        with a single LLM call.
+
+        Args:
+            location: The location for activities
+            contents: Scraped webpage contents, one entry per page
+            activity_type: Optional type of activity
+
+        Returns:
+            List of dictionaries with structured activity information
+        """
+        contents = [content for content in contents if content]
+        if not contents:
+            return []
+
+        # Drop near-identical pages (mirrors, syndicated copies) before they
+        # reach the LLM; whitespace is stripped first so formatting
+        # differences don't defeat the fingerprint
+        seen_fps = set()
+        deduped = []
+        for content in contents:
+            fingerprint = hashlib.blake2b(
+                _FP_NORM_RE.sub('', content[:4000]).encode('utf-8'),
+                digest_size=16
+            ).digest()
+            if fingerprint in seen_fps:
+                continue
+            seen_fps.add(fingerprint)
+            deduped.append(content)
+        contents = deduped
+
+        # Budget the prompt across sources so a batch stays close to the
+        # size of a single-page prompt
+        per_source = max(2000, 10000 // len(contents))
+        combined = '\n\n'.join(
+            f"---SOURCE {i}---\n{content[:per_source]}"
+            for i, content in enumerate(contents, 1)
+        )
+
+        cache_key = '|'.join((location, activity_type or '', combined[:4096]))
+        cached = self._extract_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         try:
             # Construct the prompt for the LLM
             activity_type_text = f" {activity_type}" if activity_type else ""
-            prompt = f"""Extract information about{activity_type_text} activities, attractions, or things to do in {location} from the following content. 
-            Format the information as a list of JSON objects with the following fields:
+            prompt = f"""Extract information about{activity_type_text} activities, attractions, or things to do in {location} from the following content, taken from one or more webpages delimited by ---SOURCE n--- markers.
+            Respond with a JSON object containing a single key "activities" whose value is a list of objects with the following fields:
             - name: The name of the activity or attraction
             - description: A brief description
             - highlights: Key highlights or features (list of strings)
             - price_range: Approximate price range if available (string)
             - location: Specific location within {location}
             - rating: Numerical rating if available (float between 1-5)
-            
-            Try to extract at least 3-5 distinct activities. If certain fields are not available, use null.
-            
+
+            Try to extract at least 3-5 distinct activities per source. If certain fields are not available, use null.
+
             Content:
-            {content[:5000]}"""
+            {combined}"""
             
             # Call the OpenAI API
             response = self.client.chat.completions.create(
-                model="gpt-4o",
+                model=self.model,
                 messages=[
-                    {"role": "system", "content": "You are a helpful assistant that extracts structured information about activities and attractions from webpage content."},
+                    {"role": "system", "content": (
+                        'You are a helpful assistant that extracts structured information about activities and attractions from webpage content. '
+                        'Respond with JSON shaped like this example: '
+                        '{"activities": [{"name": "Louvre Museum", "description": "World-famous art museum on the Seine.", '
+                        '"highlights": ["Mona Lisa", "Egyptian antiquities"], "price_range": "€17", '
+                        '"location": "1st arrondissement", "rating": 4.7}]}'
+                    )},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.3,
-                max_tokens=2000
+                max_tokens=1200,
+                response_format={"type": "json_object"}
             )
             
-            # Extract and parse the JSON from the response
+            # JSON mode guarantees a syntactically valid object, so parse it
+            # directly instead of fishing for JSON in free-form text
             result_text = response.choices[0].message.content
-            
-            # Find JSON content (could be with or without triple backticks)
-            import re
-            json_match = re.search(r'```json\n([\s\S]*?)\n```', result_text)
-            if json_match:
-                json_str = json_match.group(1)
-            else:
-                # Try to find a JSON array directly
-                json_match = re.search(r'\[\s*\{[\s\S]*?\}\s*\]', result_text)
-                if json_match:
-                    json_str = json_match.group(0)
-                else:
-                    # As a fallback, use the entire text
-                    json_str = result_text
-            
-            # Try to parse the JSON
             try:
-                activities = json.loads(json_str)
-                # Ensure it's a list
-                if not isinstance(activities, list):
-                    if isinstance(activities, dict):
-                        activities = [activities]
-                    else:
-                        activities = []
-            except json.JSONDecodeError:
-                # If JSON parsing fails, try to extract individually
-                logger.warning("Failed to parse JSON response, trying to extract individually")
+                activities = _json.loads(result_text).get('activities', [])
+            except ValueError:
+                logger.warning("Failed to parse JSON response")
                 activities = []
-                
-                # Simple regex to find JSON-like objects
-                object_matches = re.finditer(r'\{\s*"name"[\s\S]*?\}', json_str)
-                for match in object_matches:
-                    try:
-                        activity = json.loads(match.group(0))
-                        activities.append(activity)
-                    except:
-                        continue
+            if not isinstance(activities, list):
+                activities = [activities] if isinstance(activities, dict) else []
             
             # Add source and location information
             for activity in activities:
@@ -248,6 +359,8 @@ class DuckDuckGoActivitySearch:
                     activity['location'] = location
                 activity['source'] = 'DuckDuckGo Search'
             
+            if activities:
+                self._extract_cache.set(cache_key, activities)
             return activities
         
         except Exception as e:
@@ -281,35 +394,35 @@ class DuckDuckGoActivitySearch:
             logger.warning(f"No search results found for {location}")
             return []
         
-        # Scrape content from search results
-        all_activities = []
-        for result in search_results:
+        # Scrape the result pages in parallel, then extract from all of
+        # them with one batched LLM call instead of one call per page
+        def _scrape_result(result):
             logger.info(f"Scraping content from: {result['title']} ({result['url']})")
-            content = self.scrape_webpage(result['url'])
-            
-            if content:
-                # Extract activity information using the LLM
-                activities = self.extract_activity_info(location, content, activity_type)
-                if activities:
-                    all_activities.extend(activities)
+            return self.scrape_webpage(result['url'])
+
+        with ThreadPoolExecutor(max_workers=min(4, len(search_results))) as executor:
+            contents = list(executor.map(_scrape_result, search_results))
+
+        all_activities = self.extract_activity_info_batch(location, contents, activity_type)
         
-        # Remove duplicates (based on name)
+        # Remove duplicates (based on name), computing each activity's
+        # numeric rating once instead of in every sort comparison
         seen_names = set()
         unique_activities = []
         for activity in all_activities:
             name = activity.get('name', '').lower()
             if name and name not in seen_names:
                 seen_names.add(name)
+                activity['_rating'] = float(activity.get('rating', 0) or 0)
                 unique_activities.append(activity)
         
-        # Sort by rating (if available)
-        unique_activities.sort(
-            key=lambda x: float(x.get('rating', 0) or 0),
-            reverse=True
-        )
+        # Keep the limit highest-rated activities without sorting the
+        # whole list
+        top_activities = heapq.nlargest(limit, unique_activities, key=itemgetter('_rating'))
+        for activity in top_activities:
+            del activity['_rating']
         
-        # Return up to the limit
-        return unique_activities[:limit]
+        return top_activities
 
 # Example usage
 if __name__ == "__main__":
@@ -6,18 +6,33 @@ scraping content from the top search results, and passing that content to
 an LLM to extract structured hotel information.
 """
 
+import hashlib
 import os
 import requests
 import json
 import logging
-import time
+import re
 import random
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional
-from urllib.parse import quote_plus
-from bs4 import BeautifulSoup
+from urllib.parse import quote_plus, urlparse, parse_qs
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
+from duckduckgo_search import DDGS
+from lxml import etree, html as lxml_html
 import openai
 from dotenv import load_dotenv
 
+# orjson parses the LLM responses a few times faster than the stdlib json
+# module; fall back silently when it isn't installed
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json
+
+from travel_assistant.utils.ddg_common import DiskCache, host_rate_limiter
+
 # Load environment variables
 load_dotenv()
 
@@ -25,6 +40,26 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Browser User-Agent strings rotated onto the shared session
+USER_AGENTS = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.1 Safari/605.1.15',
+    'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/92.0.4515.107 Safari/537.36',
+    'Mozilla/5.0 (iPhone; CPU iPhone OS 14_6 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0 Mobile/15E148 Safari/604.1',
+    'Mozilla/5.0 (iPad; CPU OS 14_6 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0 Mobile/15E148 Safari/604.1'
+)
+_choice = random.choice
+
+# Only the result blocks of the DuckDuckGo HTML response are of interest, so
+# restrict parsing to them instead of building a tree for the whole page
+_RESULT_STRAINER = SoupStrainer(class_=re.compile(r'\bresult\b'))
+
+# Runs of blanks and newlines in extracted page text, collapsed in one pass
+_WS_RE = re.compile(r'[ \t]*\r?\n[ \t]*|[ \t]{2,}')
+
+# All whitespace, removed when fingerprinting content for deduplication
+_FP_NORM_RE = re.compile(r'\s+')
+
 class DuckDuckGoHotelSearch:
     """
     Class for searching hotels using DuckDuckGo, scraping content,
@@ -38,30 +73,41 @@ class DuckDuckGoHotelSearch:
             raise ValueError("OpenAI API key is missing from environment variables")
         
         self.client = openai.OpenAI(api_key=self.openai_api_key)
-        self.user_agents = [
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.1 Safari/605.1.15',
-            'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/92.0.4515.107 Safari/537.36',
-            'Mozilla/5.0 (iPhone; CPU iPhone OS 14_6 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0 Mobile/15E148 Safari/604.1',
-            'Mozilla/5.0 (iPad; CPU OS 14_6 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0 Mobile/15E148 Safari/604.1'
-        ]
-        self.last_request_time = 0
-        self.min_request_interval = 2  # seconds between requests
+        # The extraction task is simple enough for the mini model, which is
+        # markedly cheaper and faster than gpt-4o for the same schema
+        self.model = "gpt-4o-mini"
+        # Shared session with connection pooling so repeated requests reuse
+        # TCP+TLS connections instead of re-handshaking per call
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers['User-Agent'] = self._get_random_user_agent()
+        self._requests_since_rotate = 0
+
+        # On-disk caches so repeat queries skip the network and the LLM;
+        # search results go stale faster than page text or extractions
+        self._search_cache = DiskCache('ddg_serp', ttl=6 * 3600)
+        self._page_cache = DiskCache('ddg_hotel_pages', ttl=24 * 3600)
+        self._extract_cache = DiskCache('ddg_hotel_extract', ttl=7 * 24 * 3600)
     
-    def _throttle_request(self):
-        """Simple rate limiting to avoid being blocked."""
-        current_time = time.time()
-        time_since_last_request = current_time - self.last_request_time
-        
-        if time_since_last_request < self.min_request_interval:
-            sleep_time = self.min_request_interval - time_since_last_request
-            time.sleep(sleep_time)
-        
-        self.last_request_time = time.time()
+    def _throttle_request(self, url):
+        """Rate limit requests to the url's host to avoid being blocked."""
+        # Rotate the session's User-Agent occasionally rather than drawing
+        # a fresh one per request
+        self._requests_since_rotate += 1
+        if self._requests_since_rotate >= 20:
+            self._requests_since_rotate = 0
+            self.session.headers['User-Agent'] = self._get_random_user_agent()
+        host_rate_limiter.wait(url)
     
     def _get_random_user_agent(self):
         """Return a random user agent from the list."""
-        return random.choice(self.user_agents)
+        return _choice(USER_AGENTS)
     
     def search_duckduckgo(self, query: str, max_results: int = 5) -> List[Dict[str, str]]:
         """
@@ -78,44 +124,62 @@ class DuckDuckGoHotelSearch:
         encoded_query = quote_plus(query)
         url = f"https://html.duckduckgo.com/html/?q={encoded_query}"
         
+        cache_key = f"{query}|{max_results}"
+        cached = self._search_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        # Query through the duckduckgo_search client first; it talks to the
+        # lightweight JSON endpoint, which is much cheaper than fetching and
+        # parsing the full HTML results page
         try:
-            self._throttle_request()
+            self._throttle_request(url)
+            with DDGS() as ddgs:
+                results = [
+                    {'title': r.get('title', ''), 'url': r.get('href', '')}
+                    for r in ddgs.text(query, max_results=max_results)
+                ]
+            if results:
+                self._search_cache.set(cache_key, results)
+                return results
+        except Exception as e:
+            logger.warning(f"duckduckgo_search client failed, falling back to HTML scrape: {e}")
+        
+        try:
+            self._throttle_request(url)
             
-            # Send the request with a random user agent
-            headers = {'User-Agent': self._get_random_user_agent()}
-            response = requests.get(url, headers=headers, timeout=10)
+            response = self.session.get(url, timeout=10)
             response.raise_for_status()
             
-            # Parse the HTML response
-            soup = BeautifulSoup(response.text, 'html.parser')
+            # Parse only the result blocks of the HTML response
+            soup = BeautifulSoup(response.content, 'lxml', parse_only=_RESULT_STRAINER)
             results = []
             
-            # Extract search results
-            for result in soup.select('.result'):
-                title_elem = result.select_one('.result__title')
-                link_elem = result.select_one('.result__url')
+            # Extract search results with one limited CSS query instead of
+            # nested select_one calls per result block
+            for anchor in soup.select('.result .result__title a', limit=max_results):
+                title = anchor.get_text(strip=True)
+                link_href = anchor.get('href', '')
+                if not title or not link_href:
+                    continue
+                
+                # Extract the actual URL from DuckDuckGo redirect URL;
+                # don't reuse the outer `url` name, which still refers to
+                # the search endpoint
+                if 'uddg=' in link_href:
+                    parsed_url = urlparse(link_href)
+                    query_params = parse_qs(parsed_url.query)
+                    target_url = query_params.get('uddg', [''])[0]
+                else:
+                    target_url = link_href
                 
-                if title_elem and link_elem:
-                    title = title_elem.get_text(strip=True)
-                    link_href = title_elem.find('a')['href']
-                    
-                    # Extract the actual URL from DuckDuckGo redirect URL
-                    if 'uddg=' in link_href:
-                        import urllib.parse
-                        parsed_url = urllib.parse.urlparse(link_href)
-                        query_params = urllib.parse.parse_qs(parsed_url.query)
-                        url = query_params.get('uddg', [''])[0]
-                    else:
-                        url = link_href
-                    
-                    results.append({
-                        'title': title,
-                        'url': url
-                    })
-                    
-                    if len(results) >= max_results:
-                        break
+                results.append({
+                    'title': title,
+                    'url': target_url
+                })
             
+            if results:
+                self._search_cache.set(cache_key, results)
             return results
         
         except Exception as e:
@@ -132,32 +196,51 @@ class DuckDuckGoHotelSearch:
         Returns:
             Extracted text content from the webpage
         """
+        cached = self._page_cache.get(url)
+        if cached is not None:
+            return cached
+        
         try:
-            self._throttle_request()
+            self._throttle_request(url)
             
-            headers = {'User-Agent': self._get_random_user_agent()}
-            response = requests.get(url, headers=headers, timeout=15)
+            response = self.session.get(url, timeout=15, stream=True)
             response.raise_for_status()
             
-            # Parse the HTML
-            soup = BeautifulSoup(response.text, 'html.parser')
+            # Read the body in chunks and stop early on oversized pages;
+            # only the first part of the text survives the length cap anyway
+            body = bytearray()
+            for chunk in response.iter_content(65536):
+                body.extend(chunk)
+                if len(body) >= 400_000:
+                    break
+            response.close()
             
-            # Remove script and style elements
-            for script in soup(["script", "style", "header", "footer", "nav"]):
-                script.extract()
+            # Parse the HTML and drop the elements we never read
+            root = lxml_html.fromstring(bytes(body))
+            etree.strip_elements(root, 'script', 'style', 'header', 'footer', 'nav', with_tail=False)
             
-            # Get text
-            text = soup.get_text(separator=' ', strip=True)
+            # Stream text out of the tree, stopping once enough has been
+            # collected instead of materialising the full document text
+            pieces = []
+            collected = 0
+            for piece in root.itertext():
+                if not piece or piece.isspace():
+                    continue
+                pieces.append(piece)
+                collected += len(piece) + 1
+                if collected > 15000:
+                    break
+            text = ' '.join(pieces)
             
             # Clean up the text
-            lines = (line.strip() for line in text.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            text = ' '.join(chunk for chunk in chunks if chunk)
+            text = _WS_RE.sub(' ', text).strip()
             
             # Truncate if too long (to avoid token limits)
             if len(text) > 15000:
                 text = text[:15000] + "..."
             
+            if text:
+                self._page_cache.set(url, text)
             return text
         
         except Exception as e:
@@ -174,12 +257,55 @@ class DuckDuckGoHotelSearch:
         Returns:
             Dictionary with extracted hotel information
         """
-        if not content or len(content.strip()) < 100:
+        return self.extract_hotel_info_batch([content])
+    
+    def extract_hotel_info_batch(self, contents: List[str]) -> Dict[str, Any]:
+        """
+        Extract structured hotel information from several scraped pages with
+        a single LLM call.
+        
+        Args:
+            contents: Text contents from scraped webpages, one entry per page
+            
+        Returns:
+            Dictionary with extracted hotel information
+        """
+        contents = [content for content in contents if content and len(content.strip()) >= 100]
+        if not contents:
             logger.warning("Content too short, skipping extraction")
             return {}
+
+        # Drop near-identical pages (mirrors, syndicated copies) before they
+        # reach the LLM; whitespace is stripped first so formatting
+        # differences don't defeat the fingerprint
+        seen_fps = set()
+        deduped = []
+        for content in contents:
+            fingerprint = hashlib.blake2b(
+                _FP_NORM_RE.sub('', content[:4000]).encode('utf-8'),
+                digest_size=16
+            ).digest()
+            if fingerprint in seen_fps:
+                continue
+            seen_fps.add(fingerprint)
+            deduped.append(content)
+        contents = deduped
+        
+        # Budget the prompt across sources so a batch stays close to the
+        # size of a single-page prompt
+        per_source = max(3000, 15000 // len(contents))
+        combined = '\n\n'.join(
+            f"---SOURCE {i}---\n{content[:per_source]}"
+            for i, content in enumerate(contents, 1)
+        )
+        
+        cache_key = combined[:4096]
+        cached = self._extract_cache.get(cache_key)
+        if cached is not None:
+            return cached
         
         prompt = f"""
-        You are a hotel information extraction assistant. Extract detailed hotel information from the following web content.
+        You are a hotel information extraction assistant. Extract detailed hotel information from the following web content, taken from one or more pages delimited by ---SOURCE n--- markers.
         For each hotel mentioned, extract:
         
         1. Hotel name
@@ -192,9 +318,9 @@ class DuckDuckGoHotelSearch:
         8. Special features (unique selling points)
         9. Guest rating/review score (if available)
         
-        If any information is not found, leave it blank. If the content is not about hotels, reply with "No hotel information found."
+        If any information is not found, leave it blank. If the content is not about hotels, return {{"hotels": []}}.
         
-        Provide the information in JSON format with the following structure:
+        Respond with a JSON object using the following structure:
         {{
             "hotels": [
                 {{
@@ -211,40 +337,47 @@ class DuckDuckGoHotelSearch:
             ]
         }}
         
-        Return up to 3 hotels from the content. Focus on extracting accurate information rather than inventing details.
+        Return up to 3 hotels per source. Focus on extracting accurate information rather than inventing details.
         
         CONTENT:
-        {content}
+        {combined}
         
         JSON RESPONSE:
         """
         
         try:
             response = self.client.chat.completions.create(
-                model="gpt-4o",
-                messages=[{"role": "user", "content": prompt}],
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": (
+                        'You are a hotel information extraction assistant. '
+                        'Respond with JSON shaped like this example: '
+                        '{"hotels": [{"name": "Hotel Lutetia", "location": "45 Boulevard Raspail, Paris", "stars": "5", '
+                        '"price_range": "€800-1200 per night", "amenities": ["Spa", "Pool", "Restaurant"], '
+                        '"room_types": ["Deluxe", "Suite"], "description": "Restored Art Deco palace hotel on the Left Bank.", '
+                        '"special_features": ["Historic building"], "guest_rating": "9.0/10"}]}'
+                    )},
+                    {"role": "user", "content": prompt}
+                ],
                 temperature=0.3,
-                max_tokens=1500,
-                n=1
+                max_tokens=1000,
+                n=1,
+                response_format={"type": "json_object"}
             )
             
             result_text = response.choices[0].message.content.strip()
             
-            # Try to extract the JSON part from the response
+            # JSON mode guarantees a syntactically valid object, so parse it
+            # directly instead of fishing for JSON in free-form text
             try:
-                # Find JSON object in the response text (in case the LLM includes additional text)
-                import re
-                json_match = re.search(r'({[\s\S]*})', result_text)
-                if json_match:
-                    json_str = json_match.group(1)
-                    data = json.loads(json_str)
-                else:
-                    data = json.loads(result_text)
-                
-                return data
-            except json.JSONDecodeError:
+                data = _json.loads(result_text)
+            except ValueError:
                 logger.warning(f"Failed to parse JSON from LLM response: {result_text[:100]}...")
                 return {"hotels": []}
+            
+            if data.get('hotels'):
+                self._extract_cache.set(cache_key, data)
+            return data
         
         except Exception as e:
             logger.error(f"Error calling OpenAI API: {e}")
@@ -287,54 +420,47 @@ class DuckDuckGoHotelSearch:
             logger.warning(f"No search results found for hotels in {city}")
             return []
         
+        # Scrape the result pages in parallel, then extract from all of
+        # them with one batched LLM call instead of one call per page
+        def _scrape_result(result):
+            logger.info(f"Scraping content from: {result['title']} ({result['url']})")
+            return self.scrape_webpage(result['url'])
+
+        with ThreadPoolExecutor(max_workers=min(4, len(search_results))) as executor:
+            contents = list(executor.map(_scrape_result, search_results))
+
+        hotel_data = self.extract_hotel_info_batch(contents)
+
         all_hotels = []
         processed_hotel_names = set()  # To avoid duplicates
-        
-        # Process each search result
-        for result in search_results:
-            logger.info(f"Scraping content from: {result['title']} ({result['url']})")
-            content = self.scrape_webpage(result['url'])
+
+        for hotel in hotel_data.get('hotels', []):
+            # Skip hotels with missing names
+            if not hotel.get('name'):
+                continue
             
-            if not content:
+            # Skip duplicates (case-insensitive comparison)
+            if hotel['name'].lower() in processed_hotel_names:
                 continue
             
-            hotel_data = self.extract_hotel_info(content)
+            processed_hotel_names.add(hotel['name'].lower())
+            
+            # Standardize the format to match other hotel data in the system
+            standardized_hotel = {
+                'id': f"ddg-{len(all_hotels)}",
+                'name': hotel.get('name', ''),
+                'address': hotel.get('location', ''),
+                'stars': hotel.get('stars', ''),
+                'price': hotel.get('price_range', ''),
+                'amenities': hotel.get('amenities', []),
+                'description': hotel.get('description', ''),
+                'room_types': hotel.get('room_types', []),
+                'rating': hotel.get('guest_rating', ''),
+                'special_features': hotel.get('special_features', []),
+                'source': 'DuckDuckGo Web Search'
+            }
             
-            if 'hotels' in hotel_data and hotel_data['hotels']:
-                for hotel in hotel_data['hotels']:
-                    # Skip hotels with missing names
-                    if not hotel.get('name'):
-                        continue
-                    
-                    # Skip duplicates (case-insensitive comparison)
-                    if hotel['name'].lower() in processed_hotel_names:
-                        continue
-                    
-                    processed_hotel_names.add(hotel['name'].lower())
-                    
-                    # Add source URL and further standardize the data
-                    hotel['source'] = "Web Search"
-                    hotel['source_url'] = result['url']
-                    
-                    # Standardize the format to match other hotel data in the system
-                    standardized_hotel = {
-                        'id': f"ddg-{len(all_hotels)}",
-                        'name': hotel.get('name', ''),
-                        'address': hotel.get('location', ''),
-                        'stars': hotel.get('stars', ''),
-                        'price': hotel.get('price_range', ''),
-                        'amenities': hotel.get('amenities', []),
-                        'description': hotel.get('description', ''),
-                        'room_types': hotel.get('room_types', []),
-                        'rating': hotel.get('guest_rating', ''),
-                        'special_features': hotel.get('special_features', []),
-                        'source': 'DuckDuckGo Web Search'
-                    }
-                    
-                    all_hotels.append(standardized_hotel)
-                    
-                    if len(all_hotels) >= max_results:
-                        break
+            all_hotels.append(standardized_hotel)
             
             if len(all_hotels) >= max_results:
                 break
@@ -347,4 +473,7 @@ class DuckDuckGoHotelSearch:
 if __name__ == "__main__":
     hotel_search = DuckDuckGoHotelSearch()
     results = hotel_search.search_hotels("Paris", budget_level="moderate")
-    print(json.dumps(results, indent=2))
+    if _json is json:
+        print(_json.dumps(results, indent=2))
+    else:
+        print(_json.dumps(results, option=_json.OPT_INDENT_2).decode())
@@ -1,56 +1,286 @@
 """
 Module for handling API calls to Firecrawl for searching activities.
 """
+import functools
+import logging
 import os
+import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional
+import httpx
 from dotenv import load_dotenv
-from firecrawl import FirecrawlApp
+
+from travel_assistant.utils.ddg_common import DiskCache
+
+# orjson decodes the search payloads a few times faster than the stdlib
+# json module; fall back silently when it isn't installed
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json
+
+# HTTP/2 multiplexes concurrent searches over one TLS connection, but
+# httpx needs the optional h2 package for it; fall back to HTTP/1.1 with
+# keepalive when it isn't installed
+try:
+    import h2  # noqa: F401
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# How long cached search results stay fresh, and how many to keep
+_CACHE_TTL = 3600
+_CACHE_MAX = 1024
+
+# Token bucket sized for a 10-requests-per-minute plan with burst headroom
+_RATE_CAPACITY = 10
+_RATE_REFILL = 10 / 60.0  # tokens per second
+
+# Circuit breaker: after this many consecutive failures, skip Firecrawl
+# entirely for the cooldown period instead of queueing doomed requests
+_BREAKER_THRESHOLD = 3
+_BREAKER_COOLDOWN = 30  # seconds
+
+# Interned constants so every result row shares one string object and dict
+# lookups on them take the pointer-equality fast path
+_SRC_FIRECRAWL = sys.intern("Firecrawl")
+_NO_DESCRIPTION = sys.intern("No description available")
+_UNKNOWN_ACTIVITY = sys.intern("Unknown Activity")
+_UNKNOWN_RESTAURANT = sys.intern("Unknown Restaurant")
+_UNKNOWN_ATTRACTION = sys.intern("Unknown Attraction")
+_VARIOUS_CUISINE = sys.intern("Various")
+
+# Query templates; choosing one up front keeps the search paths free of
+# incremental string appends
+_QUERY_ACTIVITIES = "things to do in %s"
+_QUERY_ACTIVITIES_TYPED = "things to do in %s %s activities"
+_QUERY_RESTAURANTS = "best restaurants in %s"
+_QUERY_RESTAURANTS_TYPED = "best restaurants in %s %s food"
+_QUERY_ATTRACTIONS = "top tourist attractions in %s"
+
+
+class _InflightSearch:
+    """A pending search that other threads can wait on."""
+    
+    __slots__ = ('event', 'result', 'error')
+    
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+@functools.lru_cache(maxsize=1)
+def _load_api_key() -> str:
+    """
+    Resolve the Firecrawl API key once per process.
+    
+    Prefers a value read directly from the project .env file so long-lived
+    processes pick up the on-disk key, falling back to the environment.
+    """
+    api_key = os.getenv('FIRECRAWL_API_KEY')
+    
+    dotenv_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), '.env')
+    if os.path.exists(dotenv_path):
+        with open(dotenv_path, 'r') as f:
+            for line in f:
+                if line.startswith('FIRECRAWL_API_KEY='):
+                    api_key = line.strip().split('=', 1)[1].strip().strip("'").strip('"')
+                    logger.debug("Reloaded Firecrawl API key from .env file")
+    
+    if not api_key:
+        raise ValueError("Firecrawl API key is missing from environment variables")
+    
+    return api_key
+
+
+def _row_to_dict(result, defaults: Dict[str, Any], unknown_name: str) -> Dict[str, Any]:
+    """
+    Flatten one raw search result into the standard response fields,
+    handling both dict rows and SDK-style result objects. The constant
+    fields arrive pre-built in defaults and are spread into the literal.
+    
+    Object rows are snapshotted to a dict once — model_dump() for Pydantic
+    models, __dict__ otherwise — so each field read is a plain dict lookup
+    instead of a descriptor traversal per attribute.
+    """
+    if not isinstance(result, dict):
+        result = result.model_dump() if hasattr(result, 'model_dump') else vars(result)
+    return {
+        **defaults,
+        "name": result.get("title", unknown_name) or unknown_name,
+        "url": result.get("url", "") or "",
+        "description": result.get("description", _NO_DESCRIPTION),
+    }
+
 class FirecrawlAPIHandler:
     """
     Handler for Firecrawl API calls to search for activities in different locations.
     """
+    __slots__ = (
+        'api_key', '_client', '_tokens', '_last_refill', '_throttle_lock',
+        '_cache', '_cache_lock', '_shared_cache', '_inflight', '_inflight_lock',
+        '_fail_count', '_open_until', '_breaker_lock',
+    )
+    
     def __init__(self):
         """
         Initialize the Firecrawl API client.
         """
-        self.api_key = os.getenv('FIRECRAWL_API_KEY')
-        print(f"DEBUG: Firecrawl API key loaded: {self.api_key[:8]}...")  # Print first 8 chars for debug
+        self.api_key = _load_api_key()
         
-        if not self.api_key:
-            raise ValueError("Firecrawl API key is missing from environment variables")
+        # Talk to the search endpoint over one persistent client so TCP+TLS
+        # setup is amortized across requests instead of paid per call
+        self._client = httpx.Client(
+            base_url="https://api.firecrawl.dev",
+            headers={"Authorization": f"Bearer {self.api_key}"},
+            limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=30),
+            timeout=30.0,
+            http2=_HTTP2_AVAILABLE,
+        )
+        self._tokens = float(_RATE_CAPACITY)
+        self._last_refill = time.monotonic()
+        self._throttle_lock = threading.Lock()
         
-        # Force reload the key directly from the .env file if running in a long-lived process
-        dotenv_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), '.env')
-        if os.path.exists(dotenv_path):
-            with open(dotenv_path, 'r') as f:
-                for line in f:
-                    if line.startswith('FIRECRAWL_API_KEY='):
-                        self.api_key = line.strip().split('=', 1)[1].strip().strip("'").strip('"')
-                        print(f"DEBUG: Reloaded API key from file: {self.api_key[:8]}...")
+        # In-memory TTL cache of formatted results; repeat queries skip the
+        # throttle and the network entirely
+        self._cache: Dict[Any, Any] = {}
+        self._cache_lock = threading.Lock()
         
-        self.app = FirecrawlApp(api_key=self.api_key)
-        self.last_request_time = 0
-        self.min_request_interval = 6  # Seconds between requests to avoid rate limiting
+        # In-flight registry so concurrent identical searches collapse to
+        # one network call, with the duplicates waiting on its result
+        self._inflight: Dict[Any, _InflightSearch] = {}
+        self._inflight_lock = threading.Lock()
+        
+        # Circuit-breaker state
+        self._fail_count = 0
+        self._open_until = 0.0
+        self._breaker_lock = threading.Lock()
+        
+        # Optional cross-process layer so a multi-worker deployment shares
+        # one set of results instead of each worker hitting Firecrawl;
+        # enabled with CACHE_BACKEND=disk
+        self._shared_cache = None
+        if os.getenv('CACHE_BACKEND', '').lower() == 'disk':
+            self._shared_cache = DiskCache('firecrawl_search', ttl=_CACHE_TTL)
     
     def _throttle_request(self):
         """
-        Implement simple rate limiting to avoid hitting API limits.
-        Waits if needed to ensure minimum time between requests.
-        """
-        current_time = time.time()
-        time_since_last_request = current_time - self.last_request_time
+        Token-bucket rate limiting to avoid hitting API limits.
         
-        if time_since_last_request < self.min_request_interval:
-            sleep_time = self.min_request_interval - time_since_last_request
-            print(f"Rate limiting: Waiting {sleep_time:.2f} seconds before next request")
+        Bursts of up to the bucket capacity go through with no wait and
+        only sustained load throttles, instead of forcing a fixed gap
+        between every pair of requests.
+        """
+        while True:
+            with self._throttle_lock:
+                now = time.monotonic()
+                self._tokens = min(_RATE_CAPACITY,
+                                   self._tokens + (now - self._last_refill) * _RATE_REFILL)
+                self._last_refill = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                sleep_time = (1 - self._tokens) / _RATE_REFILL
+            
+            logger.debug("Rate limiting: waiting %.2f seconds before next request", sleep_time)
             time.sleep(sleep_time)
+    
+    @staticmethod
+    def _shared_key(key) -> str:
+        """Flatten a (query, limit) cache key for the shared backend."""
+        return 'fc:%s|%s' % key
+    
+    def _cache_get(self, key):
+        """Return cached results for key, or None if missing or expired."""
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                saved_at, value = entry
+                if time.time() - saved_at <= _CACHE_TTL:
+                    return value
+                del self._cache[key]
+        
+        # Fall back to the shared layer and promote hits into memory
+        if self._shared_cache is not None:
+            value = self._shared_cache.get(self._shared_key(key))
+            if value is not None:
+                with self._cache_lock:
+                    self._cache[key] = (time.time(), value)
+                return value
+        
+        return None
+    
+    def _cache_set(self, key, value):
+        """Cache results for key, evicting the oldest entry when full."""
+        with self._cache_lock:
+            if len(self._cache) >= _CACHE_MAX:
+                self._cache.pop(next(iter(self._cache)))
+            self._cache[key] = (time.time(), value)
         
-        self.last_request_time = time.time()
+        if self._shared_cache is not None:
+            self._shared_cache.set(self._shared_key(key), value)
+    
+    def _search(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        """
+        Post a query to the Firecrawl search endpoint and return the raw
+        result rows. Concurrent identical queries share a single request.
+        """
+        # Fail fast while the circuit is open instead of paying a throttle
+        # wait plus a network timeout for a host that is known to be down
+        if time.monotonic() < self._open_until:
+            raise RuntimeError("Firecrawl circuit breaker open; skipping search")
+        
+        key = (query, limit)
+        with self._inflight_lock:
+            pending = self._inflight.get(key)
+            if pending is None:
+                pending = _InflightSearch()
+                self._inflight[key] = pending
+                owner = True
+            else:
+                owner = False
+        
+        if not owner:
+            # Another thread is already running this exact query; wait for
+            # its answer instead of paying the throttle and network again
+            pending.event.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.result
+        
+        try:
+            self._throttle_request()
+            response = self._client.post("/v1/search", json={"query": query, "limit": limit})
+            response.raise_for_status()
+            pending.result = _json.loads(response.content).get("data", [])
+            with self._breaker_lock:
+                self._fail_count = 0
+            return pending.result
+        except Exception as e:
+            with self._breaker_lock:
+                self._fail_count += 1
+                if self._fail_count >= _BREAKER_THRESHOLD:
+                    self._open_until = time.monotonic() + _BREAKER_COOLDOWN
+                    logger.warning("Firecrawl circuit opened for %ss after %d consecutive failures",
+                                   _BREAKER_COOLDOWN, self._fail_count)
+            pending.error = e
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+            pending.event.set()
+    
+    def close(self):
+        """Release the pooled HTTP connections."""
+        self._client.close()
     
     def search_activities(self, location: str, activity_type: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
         """
@@ -64,57 +294,43 @@ class FirecrawlAPIHandler:
         Returns:
             List[Dict[str, Any]]: List of activity results with details
         """
+        return list(self.iter_activities(location, activity_type, limit))
+    
+    def iter_activities(self, location: str, activity_type: Optional[str] = None, limit: int = 10):
+        """
+        Lazily yield activities for a location as they are formatted.
+        
+        Takes the same parameters as search_activities. Callers that stop
+        early skip the remaining formatting work; the result cache is only
+        populated when the generator runs to completion.
+        """
         # Build search query based on parameters
-        query = f"things to do in {location}"
-        if activity_type:
-            query += f" {activity_type} activities"
+        query = (_QUERY_ACTIVITIES_TYPED % (location, activity_type)
+                 if activity_type else _QUERY_ACTIVITIES % location)
         
-        try:
-            # Throttle request if needed
-            self._throttle_request()
-            
-            # Perform the search
-            search_result = self.app.search(query, limit=limit)
-            
-            # Format the results
-            activities = []
-            for result in search_result.data:
-                # Handle both object attributes and dictionary access
-                if isinstance(result, dict):
-                    activity = {
-                        "name": result.get("title", "Unknown Activity"),
-                        "url": result.get("url", ""),
-                        "description": result.get("description", "No description available"),
-                        "location": location,
-                        "source": "Firecrawl"
-                    }
-                else:
-                    # Try attribute access with fallbacks
-                    try:
-                        activity = {
-                            "name": getattr(result, "title", "Unknown Activity"),
-                            "url": getattr(result, "url", ""),
-                            "description": getattr(result, "description", "No description available"),
-                            "location": location,
-                            "source": "Firecrawl"
-                        }
-                    except Exception:
-                        # Last resort fallback
-                        activity = {
-                            "name": str(result),
-                            "url": "",
-                            "description": "Error parsing activity data",
-                            "location": location,
-                            "source": "Firecrawl"
-                        }
-                
-                activities.append(activity)
-            
-            return activities
+        cache_key = (query.lower(), limit)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            yield from cached
+            return
         
+        try:
+            # Perform the search (throttled and deduplicated in _search)
+            search_result = self._search(query, limit)
         except Exception as e:
-            print(f"Error searching activities with Firecrawl: {e}")
-            return []
+            logger.error("Error searching activities with Firecrawl: %s", e)
+            return
+        
+        # Format the results; the constant fields are built once per
+        # search instead of re-assigned on every row
+        defaults = {"location": location, "source": _SRC_FIRECRAWL}
+        activities = []
+        for result in search_result:
+            activity = _row_to_dict(result, defaults, _UNKNOWN_ACTIVITY)
+            activities.append(activity)
+            yield activity
+        
+        self._cache_set(cache_key, activities)
     
     def search_restaurants(self, location: str, cuisine_type: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
         """
@@ -129,58 +345,34 @@ class FirecrawlAPIHandler:
             List[Dict[str, Any]]: List of restaurant results with details
         """
         # Build search query based on parameters
-        query = f"best restaurants in {location}"
-        if cuisine_type:
-            query += f" {cuisine_type} food"
+        query = (_QUERY_RESTAURANTS_TYPED % (location, cuisine_type)
+                 if cuisine_type else _QUERY_RESTAURANTS % location)
+        
+        cache_key = (query.lower(), limit)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            # Hand back a copy so callers can't mutate the cached list
+            return list(cached)
         
         try:
-            # Throttle request if needed
-            self._throttle_request()
-            
-            # Perform the search
-            search_result = self.app.search(query, limit=limit)
+            # Perform the search (throttled and deduplicated in _search)
+            search_result = self._search(query, limit)
             
-            # Format the results
-            restaurants = []
-            for result in search_result.data:
-                # Handle both object attributes and dictionary access
-                if isinstance(result, dict):
-                    restaurant = {
-                        "name": result.get("title", "Unknown Restaurant"),
-                        "url": result.get("url", ""),
-                        "description": result.get("description", "No description available"),
-                        "location": location,
-                        "cuisine_type": cuisine_type if cuisine_type else "Various",
-                        "source": "Firecrawl"
-                    }
-                else:
-                    # Try attribute access with fallbacks
-                    try:
-                        restaurant = {
-                            "name": getattr(result, "title", "Unknown Restaurant"),
-                            "url": getattr(result, "url", ""),
-                            "description": getattr(result, "description", "No description available"),
-                            "location": location,
-                            "cuisine_type": cuisine_type if cuisine_type else "Various",
-                            "source": "Firecrawl"
-                        }
-                    except Exception:
-                        # Last resort fallback
-                        restaurant = {
-                            "name": str(result),
-                            "url": "",
-                            "description": "Error parsing restaurant data",
-                            "location": location,
-                            "cuisine_type": cuisine_type if cuisine_type else "Various",
-                            "source": "Firecrawl"
-                        }
-                
-                restaurants.append(restaurant)
+            # Format the results; the constant fields are built once per
+            # search instead of re-assigned on every row
+            defaults = {
+                "location": location,
+                "cuisine_type": cuisine_type or _VARIOUS_CUISINE,
+                "source": _SRC_FIRECRAWL,
+            }
+            restaurants = [_row_to_dict(result, defaults, _UNKNOWN_RESTAURANT)
+                           for result in search_result]
             
+            self._cache_set(cache_key, restaurants)
             return restaurants
         
         except Exception as e:
-            print(f"Error searching restaurants with Firecrawl: {e}")
+            logger.error("Error searching restaurants with Firecrawl: %s", e)
             return []
 
     def search_tourist_attractions(self, location: str, limit: int = 10) -> List[Dict[str, Any]]:
@@ -194,51 +386,87 @@ class FirecrawlAPIHandler:
         Returns:
             List[Dict[str, Any]]: List of attraction results with details
         """
-        query = f"top tourist attractions in {location}"
+        query = _QUERY_ATTRACTIONS % location
+        
+        cache_key = (query.lower(), limit)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            # Hand back a copy so callers can't mutate the cached list
+            return list(cached)
         
         try:
-            # Throttle request if needed
-            self._throttle_request()
-            
-            # Perform the search
-            search_result = self.app.search(query, limit=limit)
+            # Perform the search (throttled and deduplicated in _search)
+            search_result = self._search(query, limit)
             
-            # Format the results
-            attractions = []
-            for result in search_result.data:
-                # Handle both object attributes and dictionary access
-                if isinstance(result, dict):
-                    attraction = {
-                        "name": result.get("title", "Unknown Attraction"),
-                        "url": result.get("url", ""),
-                        "description": result.get("description", "No description available"),
-                        "location": location,
-                        "source": "Firecrawl"
-                    }
-                else:
-                    # Try attribute access with fallbacks
-                    try:
-                        attraction = {
-                            "name": getattr(result, "title", "Unknown Attraction"),
-                            "url": getattr(result, "url", ""),
-                            "description": getattr(result, "description", "No description available"),
-                            "location": location,
-                            "source": "Firecrawl"
-                        }
-                    except Exception:
-                        # Last resort fallback
-                        attraction = {
-                            "name": str(result),
-                            "url": "",
-                            "description": "Error parsing attraction data",
-                            "location": location,
-                            "source": "Firecrawl"
-                        }
-                
-                attractions.append(attraction)
+            # Format the results; the constant fields are built once per
+            # search instead of re-assigned on every row
+            defaults = {"location": location, "source": _SRC_FIRECRAWL}
+            attractions = [_row_to_dict(result, defaults, _UNKNOWN_ATTRACTION)
+                           for result in search_result]
             
+            self._cache_set(cache_key, attractions)
             return attractions
         
         except Exception as e:
-            print(f"Error searching attractions with Firecrawl: {e}")
+            logger.error("Error searching attractions with Firecrawl: %s", e)
+            return []
+    
+    def search_tourist_attractions_batch(self, locations: List[str], limit: int = 10) -> List[List[Dict[str, Any]]]:
+        """
+        Search for tourist attractions in several locations concurrently.
+        
+        Args:
+            locations (List[str]): The locations to search
+            limit (int): Maximum number of results per location
+            
+        Returns:
+            List[List[Dict[str, Any]]]: Attraction lists in the same order
+            as the input locations; a failed location yields an empty list
+        """
+        if not locations:
             return []
+        
+        # Bounded pool so large batches queue on the token bucket instead
+        # of stampeding it all at once
+        with ThreadPoolExecutor(max_workers=min(8, len(locations))) as executor:
+            return list(executor.map(
+                lambda location: self.search_tourist_attractions(location, limit),
+                locations
+            ))
+    
+    def search_all(self, location: str, activity_type: Optional[str] = None,
+                   cuisine_type: Optional[str] = None, limit: int = 10) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Run the activity, restaurant and attraction searches for a location
+        concurrently.
+        
+        Args:
+            location (str): The location to search
+            activity_type (str, optional): Type of activity to search for
+            cuisine_type (str, optional): Type of cuisine to search for
+            limit (int): Maximum number of results per category
+            
+        Returns:
+            Dict[str, List[Dict[str, Any]]]: Results keyed by 'activities',
+            'restaurants' and 'attractions'
+        """
+        # The three searches are independent I/O, so overlapping them means
+        # the total wait is the longest single search rather than the sum
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = {
+                'activities': executor.submit(self.search_activities, location, activity_type, limit),
+                'restaurants': executor.submit(self.search_restaurants, location, cuisine_type, limit),
+                'attractions': executor.submit(self.search_tourist_attractions, location, limit),
+            }
+            
+            results = {}
+            for category, future in futures.items():
+                try:
+                    results[category] = future.result()
+                except Exception as e:
+                    # Mirror the per-method error handling: one failed
+                    # category shouldn't sink the others
+                    logger.error("Error searching %s with Firecrawl: %s", category, e)
+                    results[category] = []
+        
+        return results
@@ -5,16 +5,34 @@ This module provides functions to scrape flight information from
 popular flight booking sites based on user preferences.
 """
 
-import requests
-from bs4 import BeautifulSoup
+import httpx
+from bs4 import BeautifulSoup, SoupStrainer
+import soupsieve
+import functools
+import heapq
 import re
-import json
 import logging
 import random
 import time
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Dict, Any, Optional
 
+from travel_assistant.utils.ddg_common import DiskCache
+
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json
+
+# HTTP/2 lets the five parallel site scrapes share multiplexed TLS
+# connections, but httpx needs the optional h2 package for it; fall
+# back to HTTP/1.1 with keepalive when it isn't installed
+try:
+    import h2  # noqa: F401
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -27,6 +45,102 @@ USER_AGENTS = [
     'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:90.0) Gecko/20100101 Firefox/90.0'
 ]
 
+# Fully-formed per-request header dicts, built once; requests merges these
+# over the session defaults without mutating them, so sharing is safe
+_HEADER_VARIANTS = tuple(
+    {'User-Agent': ua} for ua in USER_AGENTS
+)
+
+# Parse only the result-card subtrees; the surrounding page chrome is never
+# queried, so keeping it out of the tree cuts parse time and memory
+_SKYSCANNER_STRAINER = SoupStrainer('div', attrs={'data-testid': 'itinerary-card'})
+_KAYAK_STRAINER = SoupStrainer('div', class_=re.compile(r'resultWrapper'))
+_GOOGLE_STRAINER = SoupStrainer('div', attrs={'role': 'listitem'})
+_PRICELINE_STRAINER = SoupStrainer('div', class_=re.compile(r'sc-eSePXI|tile-generic-content'))
+
+# Patterns used on every card/price cell, compiled once at import
+_PRICE_RE = re.compile(r'[\$\€\£\₹]?\s*?(\d+[,\.\d]*)')
+_AIRLINE_RE = re.compile(r'^([A-Za-z\s]+)')
+_DURATION_RE = re.compile(r'(\d+h\s*\d*m)')
+_STOPS_RE = re.compile(r'(\d+)\s+stop')
+_STOPS_COUNT_RE = re.compile(r'(\d+)')
+
+# Upper bound on how much of a page we buffer; flight results appear well
+# within this and it keeps a misbehaving endpoint from exhausting memory
+_MAX_BODY_BYTES = 2_000_000
+
+
+@functools.lru_cache(maxsize=64)
+def _css(selector: str) -> soupsieve.SoupSieve:
+    """Compile a CSS selector once so per-card lookups skip recompilation."""
+    return soupsieve.compile(selector)
+
+
+
+# Per-site selectors, compiled once at import; the card loops index
+# these dicts instead of carrying selector strings inline
+_SKYSCANNER_SELECTORS = {
+    'card': _css("div[data-testid='itinerary-card']"),
+    'airline': _css("div[data-testid='flight-info'] span"),
+    'price': _css("span[data-testid='price']"),
+    'duration': _css("span[data-testid='duration']"),
+    'times': _css("span[data-testid='flight-times']"),
+    'stops': _css("span[data-testid='stops']"),
+}
+_KAYAK_SELECTORS = {
+    'card': _css("div[class*='resultWrapper']"),
+    'airline': _css("div[class*='codeshares-airline-names']"),
+    'price': _css("span[class*='price-text']"),
+    'duration': _css("div[class*='duration']"),
+    'depart_time': _css("span[class*='depart-time']"),
+    'arrival_time': _css("span[class*='arrival-time']"),
+    'stops': _css("span[class*='stops-text']"),
+}
+_EXPEDIA_SELECTORS = {
+    'card': _css("div.uitk-card"),
+    'airline': _css("div[data-test-id='airline-name']"),
+    'price': _css("span[data-test-id='price-column']"),
+    'duration': _css("div[data-test-id='journey-duration']"),
+    'stops': _css("div[data-test-id='stops']"),
+}
+_GOOGLE_SELECTORS = {
+    'card': _css("div[role='listitem']"),
+    'price': _css("div[aria-label*='$']"),
+    'rows': _css("div[role='row']"),
+}
+_PRICELINE_SELECTORS = {
+    'card': _css("div.sc-eSePXI, div.tile-generic-content"),
+    'airline': _css("div.sc-dUbtfd, span.airline-name"),
+    'price': _css("span.sc-TFwJa, span.total-price"),
+    'duration': _css("div.sc-kqlzXE, span.duration"),
+    'times': _css("div.sc-OxbzP, div.flight-times"),
+    'stops': _css("div.sc-lnrBVv, span.stops"),
+}
+
+
+def _ymd(date_str: str) -> str:
+    """Validate a YYYY-MM-DD date string and return it unchanged"""
+    if len(date_str) != 10 or date_str[4] != '-' or date_str[7] != '-':
+        raise ValueError(f"Expected YYYY-MM-DD date, got {date_str!r}")
+    return date_str
+
+
+def _ymd_compact(date_str: str) -> str:
+    """Convert a YYYY-MM-DD date string to Skyscanner's YYMMDD format"""
+    _ymd(date_str)
+    return date_str[2:4] + date_str[5:7] + date_str[8:10]
+
+
+def _count_stops(stops_text):
+    """Number of stops parsed from a stops label, 999 when unparseable"""
+    if not stops_text or stops_text.lower() in ("direct", "nonstop"):
+        return 0
+    try:
+        return int(_STOPS_COUNT_RE.search(stops_text).group(1))
+    except (AttributeError, ValueError):
+        return 999  # High number for unknown
+
+
 
 class FlightScraper:
     """A class for scraping flight information from various websites"""
@@ -34,48 +148,94 @@ class FlightScraper:
     def __init__(self, timeout=15, max_retries=3):
         self.timeout = timeout
         self.max_retries = max_retries
-    
-    def get_random_user_agent(self) -> str:
-        """Return a random user agent to avoid detection"""
-        return random.choice(USER_AGENTS)
-    
-    def make_request(self, url: str, headers=None, params=None) -> Optional[requests.Response]:
-        """Make HTTP request with retry logic"""
-        if headers is None:
-            headers = {
-                'User-Agent': self.get_random_user_agent(),
+        # One pooled client per scraper: keep-alive (and HTTP/2 where
+        # available) connections to the five booking sites survive across
+        # requests instead of paying a fresh TCP + TLS handshake every time
+        self.session = httpx.Client(
+            http2=_HTTP2_AVAILABLE,
+            follow_redirects=True,
+            limits=httpx.Limits(max_keepalive_connections=10, max_connections=20),
+            headers={
                 'Accept-Language': 'en-US,en;q=0.9',
                 'Accept': 'text/html,application/xhtml+xml,application/xml'
             }
+        )
+        # Flight prices are stable over a few minutes; short-TTL cache lets
+        # repeated searches for the same route skip the network entirely
+        self._results_cache = DiskCache('flight_results', ttl=300)
+
+    def close(self):
+        """Release the pooled connections held by the session"""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def make_request(self, url: str, headers=None, params=None) -> Optional[httpx.Response]:
+        """Make HTTP request with retry logic"""
+        if headers is None:
+            headers = _HEADER_VARIANTS[random.randrange(len(_HEADER_VARIANTS))]
             
         retries = 0
         while retries < self.max_retries:
             try:
-                response = requests.get(url, headers=headers, params=params, timeout=self.timeout)
-                response.raise_for_status()
+                request = self.session.build_request('GET', url, headers=headers,
+                                                     params=params, timeout=self.timeout)
+                response = self.session.send(request, stream=True)
+                try:
+                    response.raise_for_status()
+                except httpx.HTTPStatusError:
+                    response.close()
+                    raise
                 return response
-            except requests.RequestException as e:
+            except httpx.HTTPError as e:
+                # 4xx responses will not change on retry; fail fast instead
+                # of burning seconds of backoff on a bad URL or block page
+                if (isinstance(e, httpx.HTTPStatusError)
+                        and 400 <= e.response.status_code < 500):
+                    logger.error(f"Client error {e.response.status_code} for {url}: {e}")
+                    return None
+
                 retries += 1
                 if retries >= self.max_retries:
                     logger.error(f"Failed to retrieve {url} after {self.max_retries} attempts: {e}")
                     return None
                 
-                logger.warning(f"Attempt {retries} failed. Retrying in {retries * 2} seconds...")
-                time.sleep(retries * 2)
+                # Exponential backoff with jitter so the parallel site
+                # scrapers do not retry in lockstep
+                delay = min(8, (2 ** retries) + random.random())
+                logger.warning(f"Attempt {retries} failed. Retrying in {delay:.1f} seconds...")
+                time.sleep(delay)
         return None
     
+    def _read_body(self, response: httpx.Response) -> bytes:
+        """Read a streamed response in 64 KB chunks, capped at _MAX_BODY_BYTES"""
+        body = bytearray()
+        for chunk in response.iter_bytes(65536):
+            body.extend(chunk)
+            if len(body) >= _MAX_BODY_BYTES:
+                logger.debug(f"Truncating oversized response from {response.url}")
+                break
+        response.close()
+        return bytes(body)
+
     def clean_text(self, text: str) -> str:
         """Clean and normalize text"""
-        if text is None:
+        if not text:
             return ""
-        return re.sub(r'\s+', ' ', text).strip()
+        # str.split tokenizes on any whitespace run in C; faster than a
+        # regex substitution for the short strings cards produce
+        return ' '.join(text.split())
     
     def extract_price(self, price_text: str) -> Optional[float]:
         """Extract numeric price from text"""
         if not price_text:
             return None
             
-        price_match = re.search(r'[\$\€\£\₹]?\s*?(\d+[,\.\d]*)', price_text)
+        price_match = _PRICE_RE.search(price_text)
         if price_match:
             price_str = price_match.group(1).replace(',', '')
             try:
@@ -91,14 +251,11 @@ class FlightScraper:
         base_url = "https://www.skyscanner.com"
         
         # Format dates for Skyscanner (YYMMDD)
-        date_obj = datetime.strptime(date, "%Y-%m-%d")
-        date_formatted = date_obj.strftime("%y%m%d")
+        date_formatted = _ymd_compact(date)
         
         return_param = ""
         if return_date:
-            return_date_obj = datetime.strptime(return_date, "%Y-%m-%d")
-            return_formatted = return_date_obj.strftime("%y%m%d")
-            return_param = f"/{return_formatted}"
+            return_param = f"/{_ymd_compact(return_date)}"
         
         search_url = f"{base_url}/transport/flights/{origin}/{destination}/{date_formatted}{return_param}/"
         
@@ -108,57 +265,63 @@ class FlightScraper:
             'cabinclass': 'economy'  # Default cabin class
         }
         
+        cache_key = f"skyscanner|{origin}|{destination}|{date}|{return_date or ''}|{adults}"
+        cached = self._results_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         logger.info(f"Searching Skyscanner for flights from {origin} to {destination} on {date}")
         response = self.make_request(search_url, params=params)
         if not response:
             return []
             
         results = []
-        soup = BeautifulSoup(response.content, 'html.parser')
+        base = {"origin": origin, "destination": destination, "date": date,
+                "return_date": return_date, "source": "Skyscanner"}
+        soup = BeautifulSoup(self._read_body(response), 'lxml',
+                             from_encoding=response.encoding or 'utf-8', parse_only=_SKYSCANNER_STRAINER)
         
         # Try to extract data from the page
         try:
-            flight_cards = soup.select("div[data-testid='itinerary-card']")
+            flight_cards = _SKYSCANNER_SELECTORS['card'].select(soup)
             for card in flight_cards:
                 try:
                     # Extract airline
-                    airline_elem = card.select_one("div[data-testid='flight-info'] span")
+                    airline_elem = _SKYSCANNER_SELECTORS['airline'].select_one(card)
                     airline = self.clean_text(airline_elem.text) if airline_elem else ""
                     
                     # Extract price
-                    price_elem = card.select_one("span[data-testid='price']")
+                    price_elem = _SKYSCANNER_SELECTORS['price'].select_one(card)
                     price = self.extract_price(price_elem.text) if price_elem else None
                     
                     # Extract flight duration
-                    duration_elem = card.select_one("span[data-testid='duration']")
+                    duration_elem = _SKYSCANNER_SELECTORS['duration'].select_one(card)
                     duration = self.clean_text(duration_elem.text) if duration_elem else ""
                     
                     # Extract departure and arrival times
-                    times_elem = card.select_one("span[data-testid='flight-times']")
+                    times_elem = _SKYSCANNER_SELECTORS['times'].select_one(card)
                     times = self.clean_text(times_elem.text) if times_elem else ""
                     
                     # Extract stops
-                    stops_elem = card.select_one("span[data-testid='stops']")
+                    stops_elem = _SKYSCANNER_SELECTORS['stops'].select_one(card)
                     stops = self.clean_text(stops_elem.text) if stops_elem else "Direct"
                     
-                    results.append({
-                        "airline": airline,
-                        "price": price,
-                        "duration": duration,
-                        "times": times,
-                        "stops": stops,
-                        "origin": origin,
-                        "destination": destination,
-                        "date": date,
-                        "return_date": return_date,
-                        "source": "Skyscanner"
-                    })
+                    flight = base.copy()
+                    flight["airline"] = airline
+                    flight["price"] = price
+                    flight["duration"] = duration
+                    flight["times"] = times
+                    flight["stops"] = stops
+                    results.append(flight)
                 except Exception as e:
                     logger.debug(f"Error parsing Skyscanner flight card: {e}")
         except Exception as e:
             logger.error(f"Error parsing Skyscanner results: {e}")
             
-        return self._filter_and_rank_results(results)
+        ranked = self._filter_and_rank_results(results)
+        if ranked:
+            self._results_cache.set(cache_key, ranked)
+        return ranked
     
     # KAYAK SCRAPING
     def scrape_kayak(self, origin: str, destination: str, date: str, 
@@ -176,62 +339,68 @@ class FlightScraper:
             'adults': adults
         }
         
+        cache_key = f"kayak|{origin}|{destination}|{date}|{return_date or ''}|{adults}"
+        cached = self._results_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         logger.info(f"Searching Kayak for flights from {origin} to {destination} on {date}")
         response = self.make_request(search_url, params=params)
         if not response:
             return []
             
         results = []
-        soup = BeautifulSoup(response.content, 'html.parser')
+        base = {"origin": origin, "destination": destination, "date": date,
+                "return_date": return_date, "source": "Kayak"}
+        soup = BeautifulSoup(self._read_body(response), 'lxml',
+                             from_encoding=response.encoding or 'utf-8', parse_only=_KAYAK_STRAINER)
         
         # Extract flight results
         try:
-            flight_cards = soup.select("div[class*='resultWrapper']")
+            flight_cards = _KAYAK_SELECTORS['card'].select(soup)
             for card in flight_cards:
                 try:
                     # Extract airline
-                    airline_elem = card.select_one("div[class*='codeshares-airline-names']")
+                    airline_elem = _KAYAK_SELECTORS['airline'].select_one(card)
                     airline = self.clean_text(airline_elem.text) if airline_elem else ""
                     
                     # Extract price
-                    price_elem = card.select_one("span[class*='price-text']")
+                    price_elem = _KAYAK_SELECTORS['price'].select_one(card)
                     price = self.extract_price(price_elem.text) if price_elem else None
                     
                     # Extract flight duration
-                    duration_elem = card.select_one("div[class*='duration']")
+                    duration_elem = _KAYAK_SELECTORS['duration'].select_one(card)
                     duration = self.clean_text(duration_elem.text) if duration_elem else ""
                     
                     # Extract departure time
-                    dep_time_elem = card.select_one("span[class*='depart-time']")
+                    dep_time_elem = _KAYAK_SELECTORS['depart_time'].select_one(card)
                     dep_time = self.clean_text(dep_time_elem.text) if dep_time_elem else ""
                     
                     # Extract arrival time
-                    arr_time_elem = card.select_one("span[class*='arrival-time']")
+                    arr_time_elem = _KAYAK_SELECTORS['arrival_time'].select_one(card)
                     arr_time = self.clean_text(arr_time_elem.text) if arr_time_elem else ""
                     
                     # Extract stops
-                    stops_elem = card.select_one("span[class*='stops-text']")
+                    stops_elem = _KAYAK_SELECTORS['stops'].select_one(card)
                     stops = self.clean_text(stops_elem.text) if stops_elem else "Direct"
                     
-                    results.append({
-                        "airline": airline,
-                        "price": price,
-                        "duration": duration,
-                        "departure_time": dep_time,
-                        "arrival_time": arr_time,
-                        "stops": stops,
-                        "origin": origin,
-                        "destination": destination,
-                        "date": date,
-                        "return_date": return_date,
-                        "source": "Kayak"
-                    })
+                    flight = base.copy()
+                    flight["airline"] = airline
+                    flight["price"] = price
+                    flight["duration"] = duration
+                    flight["departure_time"] = dep_time
+                    flight["arrival_time"] = arr_time
+                    flight["stops"] = stops
+                    results.append(flight)
                 except Exception as e:
                     logger.debug(f"Error parsing Kayak flight card: {e}")
         except Exception as e:
             logger.error(f"Error parsing Kayak results: {e}")
             
-        return self._filter_and_rank_results(results)
+        ranked = self._filter_and_rank_results(results)
+        if ranked:
+            self._results_cache.set(cache_key, ranked)
+        return ranked
     
     # EXPEDIA FLIGHTS SCRAPING
     def scrape_expedia_flights(self, origin: str, destination: str, date: str, 
@@ -252,13 +421,21 @@ class FlightScraper:
         if return_date:
             params['leg2'] = f"from:{destination},to:{origin},departure:{return_date}"
             
+        cache_key = f"expedia|{origin}|{destination}|{date}|{return_date or ''}|{adults}"
+        cached = self._results_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         logger.info(f"Searching Expedia for flights from {origin} to {destination} on {date}")
         response = self.make_request(search_url, params=params)
         if not response:
             return []
             
         results = []
-        soup = BeautifulSoup(response.content, 'html.parser')
+        base = {"origin": origin, "destination": destination, "date": date,
+                "return_date": return_date, "source": "Expedia"}
+        soup = BeautifulSoup(self._read_body(response), 'lxml',
+                             from_encoding=response.encoding or 'utf-8')
         
         # Try to extract flight data
         try:
@@ -266,70 +443,68 @@ class FlightScraper:
             scripts = soup.find_all("script", type="application/json")
             for script in scripts:
                 if "data-state" in script.attrs:
+                    raw = script.string
+                    # Cheap substring check before decoding a potentially
+                    # multi-MB state blob that cannot contain offers anyway
+                    if not raw or '"offers"' not in raw:
+                        continue
                     try:
-                        data = json.loads(script.string)
+                        data = _json.loads(raw)
                         if "offers" in data:
                             for offer in data["offers"]:
                                 try:
-                                    result = {
-                                        "airline": offer.get("airlineName", ""),
-                                        "price": offer.get("totalPrice", {}).get("amount"),
-                                        "duration": offer.get("formattedDuration", ""),
-                                        "departure_time": offer.get("departureTime", ""),
-                                        "arrival_time": offer.get("arrivalTime", ""),
-                                        "stops": f"{offer.get('stopCount', 0)} stops",
-                                        "origin": origin,
-                                        "destination": destination,
-                                        "date": date,
-                                        "return_date": return_date,
-                                        "source": "Expedia"
-                                    }
+                                    get = offer.get
+                                    result = base.copy()
+                                    result["airline"] = get("airlineName", "")
+                                    result["price"] = get("totalPrice", {}).get("amount")
+                                    result["duration"] = get("formattedDuration", "")
+                                    result["departure_time"] = get("departureTime", "")
+                                    result["arrival_time"] = get("arrivalTime", "")
+                                    result["stops"] = f"{get('stopCount', 0)} stops"
                                     results.append(result)
                                 except Exception as e:
                                     logger.debug(f"Error parsing Expedia flight offer: {e}")
                             break
-                    except (json.JSONDecodeError, AttributeError) as e:
+                    except (ValueError, AttributeError) as e:
                         logger.debug(f"Error decoding Expedia JSON: {e}")
                         
             # If JSON parsing failed, try HTML parsing
             if not results:
-                flight_cards = soup.select("div.uitk-card")
+                flight_cards = _EXPEDIA_SELECTORS['card'].select(soup)
                 for card in flight_cards:
                     try:
                         # Extract airline
-                        airline_elem = card.select_one("div[data-test-id='airline-name']")
+                        airline_elem = _EXPEDIA_SELECTORS['airline'].select_one(card)
                         airline = self.clean_text(airline_elem.text) if airline_elem else ""
                         
                         # Extract price
-                        price_elem = card.select_one("span[data-test-id='price-column']")
+                        price_elem = _EXPEDIA_SELECTORS['price'].select_one(card)
                         price = self.extract_price(price_elem.text) if price_elem else None
                         
                         # Extract duration
-                        duration_elem = card.select_one("div[data-test-id='journey-duration']")
+                        duration_elem = _EXPEDIA_SELECTORS['duration'].select_one(card)
                         duration = self.clean_text(duration_elem.text) if duration_elem else ""
                         
                         # Extract stops
-                        stops_elem = card.select_one("div[data-test-id='stops']")
+                        stops_elem = _EXPEDIA_SELECTORS['stops'].select_one(card)
                         stops = self.clean_text(stops_elem.text) if stops_elem else "Direct"
                         
-                        results.append({
-                            "airline": airline,
-                            "price": price,
-                            "duration": duration,
-                            "stops": stops,
-                            "origin": origin,
-                            "destination": destination,
-                            "date": date,
-                            "return_date": return_date,
-                            "source": "Expedia"
-                        })
+                        flight = base.copy()
+                        flight["airline"] = airline
+                        flight["price"] = price
+                        flight["duration"] = duration
+                        flight["stops"] = stops
+                        results.append(flight)
                     except Exception as e:
                         logger.debug(f"Error parsing Expedia flight card: {e}")
                         
         except Exception as e:
             logger.error(f"Error parsing Expedia flight results: {e}")
             
-        return self._filter_and_rank_results(results)
+        ranked = self._filter_and_rank_results(results)
+        if ranked:
+            self._results_cache.set(cache_key, ranked)
+        return ranked
     
     # GOOGLE FLIGHTS SCRAPING (Note: Google might block scraping attempts)
     def scrape_google_flights(self, origin: str, destination: str, date: str, 
@@ -350,28 +525,36 @@ class FlightScraper:
             'sort': 'price'
         }
         
+        cache_key = f"google_flights|{origin}|{destination}|{date}|{return_date or ''}|{adults}"
+        cached = self._results_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         logger.info(f"Searching Google Flights for flights from {origin} to {destination} on {date}")
         response = self.make_request(search_url, params=params)
         if not response:
             return []
             
         results = []
-        soup = BeautifulSoup(response.content, 'html.parser')
+        base = {"origin": origin, "destination": destination, "date": date,
+                "return_date": return_date, "source": "Google Flights"}
+        soup = BeautifulSoup(self._read_body(response), 'lxml',
+                             from_encoding=response.encoding or 'utf-8', parse_only=_GOOGLE_STRAINER)
         
         # Google Flights is particularly difficult to scrape as it uses React/JS heavily
         # This is a simplified approach that may not work consistently
         try:
-            flight_cards = soup.select("div[role='listitem']")
+            flight_cards = _GOOGLE_SELECTORS['card'].select(soup)
             for card in flight_cards:
                 try:
-                    price_elem = card.select_one("div[aria-label*='$']")
+                    price_elem = _GOOGLE_SELECTORS['price'].select_one(card)
                     if not price_elem:
                         continue
                         
                     price = self.extract_price(price_elem.get('aria-label', ''))
                     
                     # Extract airline and other details
-                    info_elems = card.select("div[role='row']")
+                    info_elems = _GOOGLE_SELECTORS['rows'].select(card)
                     airline = ""
                     duration = ""
                     stops = "Direct"
@@ -380,41 +563,36 @@ class FlightScraper:
                         info_text = self.clean_text(info_elems[0].text)
                         
                         # Try to extract airline from the first part of text
-                        airline_pattern = r'^([A-Za-z\s]+)'
-                        airline_match = re.search(airline_pattern, info_text)
+                        airline_match = _AIRLINE_RE.search(info_text)
                         if airline_match:
                             airline = airline_match.group(1).strip()
                             
                         # Try to extract duration
-                        duration_pattern = r'(\d+h\s*\d*m)'
-                        duration_match = re.search(duration_pattern, info_text)
+                        duration_match = _DURATION_RE.search(info_text)
                         if duration_match:
                             duration = duration_match.group(1)
                             
                         # Check if flight is non-stop or has stops
                         if 'stop' in info_text.lower():
-                            stops_pattern = r'(\d+)\s+stop'
-                            stops_match = re.search(stops_pattern, info_text)
+                            stops_match = _STOPS_RE.search(info_text)
                             if stops_match:
                                 stops = f"{stops_match.group(1)} stops"
                     
-                    results.append({
-                        "airline": airline,
-                        "price": price,
-                        "duration": duration,
-                        "stops": stops,
-                        "origin": origin,
-                        "destination": destination,
-                        "date": date,
-                        "return_date": return_date,
-                        "source": "Google Flights"
-                    })
+                    flight = base.copy()
+                    flight["airline"] = airline
+                    flight["price"] = price
+                    flight["duration"] = duration
+                    flight["stops"] = stops
+                    results.append(flight)
                 except Exception as e:
                     logger.debug(f"Error parsing Google Flights card: {e}")
         except Exception as e:
             logger.error(f"Error parsing Google Flights results: {e}")
             
-        return self._filter_and_rank_results(results)
+        ranked = self._filter_and_rank_results(results)
+        if ranked:
+            self._results_cache.set(cache_key, ranked)
+        return ranked
     
     # PRICELINE SCRAPING
     def scrape_priceline(self, origin: str, destination: str, date: str, 
@@ -423,9 +601,8 @@ class FlightScraper:
         base_url = "https://www.priceline.com"
         search_url = f"{base_url}/m/fly/search"
         
-        # Format dates for URL
-        date_obj = datetime.strptime(date, "%Y-%m-%d")
-        date_formatted = date_obj.strftime("%Y-%m-%d")
+        # Dates are already in the YYYY-MM-DD form Priceline expects
+        date_formatted = _ymd(date)
         
         params = {
             'cabin-class': 'ECO',
@@ -436,121 +613,133 @@ class FlightScraper:
         }
         
         if return_date:
-            return_date_obj = datetime.strptime(return_date, "%Y-%m-%d")
-            return_date_formatted = return_date_obj.strftime("%Y-%m-%d")
-            params['return-date'] = return_date_formatted
+            params['return-date'] = _ymd(return_date)
             
+        cache_key = f"priceline|{origin}|{destination}|{date}|{return_date or ''}|{adults}"
+        cached = self._results_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         logger.info(f"Searching Priceline for flights from {origin} to {destination} on {date}")
         response = self.make_request(search_url, params=params)
         if not response:
             return []
             
         results = []
-        soup = BeautifulSoup(response.content, 'html.parser')
+        base = {"origin": origin, "destination": destination, "date": date,
+                "return_date": return_date, "source": "Priceline"}
+        soup = BeautifulSoup(self._read_body(response), 'lxml',
+                             from_encoding=response.encoding or 'utf-8', parse_only=_PRICELINE_STRAINER)
         
         # Try to extract flight data
         try:
-            flight_cards = soup.select("div.sc-eSePXI, div.tile-generic-content")
+            flight_cards = _PRICELINE_SELECTORS['card'].select(soup)
             for card in flight_cards:
                 try:
                     # Extract airline
-                    airline_elem = card.select_one("div.sc-dUbtfd, span.airline-name")
+                    airline_elem = _PRICELINE_SELECTORS['airline'].select_one(card)
                     airline = self.clean_text(airline_elem.text) if airline_elem else ""
                     
                     # Extract price
-                    price_elem = card.select_one("span.sc-TFwJa, span.total-price")
+                    price_elem = _PRICELINE_SELECTORS['price'].select_one(card)
                     price = self.extract_price(price_elem.text) if price_elem else None
                     
                     # Extract duration
-                    duration_elem = card.select_one("div.sc-kqlzXE, span.duration")
+                    duration_elem = _PRICELINE_SELECTORS['duration'].select_one(card)
                     duration = self.clean_text(duration_elem.text) if duration_elem else ""
                     
                     # Extract departure and arrival times
-                    times_elem = card.select_one("div.sc-OxbzP, div.flight-times")
+                    times_elem = _PRICELINE_SELECTORS['times'].select_one(card)
                     times = self.clean_text(times_elem.text) if times_elem else ""
                     
                     # Extract stops
-                    stops_elem = card.select_one("div.sc-lnrBVv, span.stops")
+                    stops_elem = _PRICELINE_SELECTORS['stops'].select_one(card)
                     stops = self.clean_text(stops_elem.text) if stops_elem else "Direct"
                     
-                    results.append({
-                        "airline": airline,
-                        "price": price,
-                        "duration": duration,
-                        "times": times,
-                        "stops": stops,
-                        "origin": origin,
-                        "destination": destination,
-                        "date": date,
-                        "return_date": return_date,
-                        "source": "Priceline"
-                    })
+                    flight = base.copy()
+                    flight["airline"] = airline
+                    flight["price"] = price
+                    flight["duration"] = duration
+                    flight["times"] = times
+                    flight["stops"] = stops
+                    results.append(flight)
                 except Exception as e:
                     logger.debug(f"Error parsing Priceline flight card: {e}")
         except Exception as e:
             logger.error(f"Error parsing Priceline results: {e}")
             
-        return self._filter_and_rank_results(results)
+        ranked = self._filter_and_rank_results(results)
+        if ranked:
+            self._results_cache.set(cache_key, ranked)
+        return ranked
     
     def _filter_and_rank_results(self, results: List[Dict[str, Any]], top_n: int = 3) -> List[Dict[str, Any]]:
         """Filter and rank results, returning top N"""
         if not results:
             return []
             
-        # For flights, sort by number of stops (ascending) then price (ascending)
-        def count_stops(stops_text):
-            if not stops_text or stops_text.lower() == "direct" or stops_text.lower() == "nonstop":
-                return 0
-            try:
-                return int(re.search(r'(\d+)', stops_text).group(1))
-            except (AttributeError, ValueError):
-                return 999  # High number for unknown
-                
-        sorted_results = sorted(
-            [r for r in results if r.get("price")], 
-            key=lambda x: (count_stops(x.get("stops", "")), x.get("price") or float('inf'))
+        # For flights, rank by number of stops (ascending) then price
+        # (ascending); a bounded heap avoids sorting every offer for top 3
+        return heapq.nsmallest(
+            top_n,
+            [r for r in results if r.get("price")],
+            key=lambda x: (_count_stops(x.get("stops", "")), x.get("price") or float('inf'))
         )
-        
-        return sorted_results[:top_n]
     
     def search_flights_all_sites(self, origin: str, destination: str, date: str,
                                return_date: Optional[str] = None, adults: int = 1) -> Dict[str, List[Dict[str, Any]]]:
         """Search for flights across all supported sites"""
+        sites = {
+            "skyscanner": self.scrape_skyscanner,
+            "kayak": self.scrape_kayak,
+            "expedia": self.scrape_expedia_flights,
+            "google_flights": self.scrape_google_flights,
+            "priceline": self.scrape_priceline,
+        }
+
+        # The five sites are independent, so scrape them in parallel and let
+        # the slowest one set the overall latency instead of the sum. Results
+        # are collected as each site finishes rather than in submission order.
         results = {}
-        
-        # Search each site
-        try:
-            results["skyscanner"] = self.scrape_skyscanner(origin, destination, date, return_date, adults)
-        except Exception as e:
-            logger.error(f"Error searching Skyscanner: {e}")
-            results["skyscanner"] = []
-            
-        try:
-            results["kayak"] = self.scrape_kayak(origin, destination, date, return_date, adults)
-        except Exception as e:
-            logger.error(f"Error searching Kayak: {e}")
-            results["kayak"] = []
-            
-        try:
-            results["expedia"] = self.scrape_expedia_flights(origin, destination, date, return_date, adults)
-        except Exception as e:
-            logger.error(f"Error searching Expedia: {e}")
-            results["expedia"] = []
-            
-        try:
-            results["google_flights"] = self.scrape_google_flights(origin, destination, date, return_date, adults)
-        except Exception as e:
-            logger.error(f"Error searching Google Flights: {e}")
-            results["google_flights"] = []
-            
-        try:
-            results["priceline"] = self.scrape_priceline(origin, destination, date, return_date, adults)
-        except Exception as e:
-            logger.error(f"Error searching Priceline: {e}")
-            results["priceline"] = []
-            
+        with ThreadPoolExecutor(max_workers=len(sites)) as executor:
+            futures = {
+                executor.submit(scrape, origin, destination, date, return_date, adults): name
+                for name, scrape in sites.items()
+            }
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    logger.error(f"Error searching {name}: {e}")
+                    results[name] = []
         return results
 
+    def search_flights_many(self, routes: List[Dict[str, Any]]) -> List[Dict[str, List[Dict[str, Any]]]]:
+        """
+        Search several routes concurrently.
+
+        Each route is a dict with 'origin', 'destination' and 'date' keys
+        plus optional 'return_date' and 'adults'. Returns the per-site
+        result dicts in the same order as the input, sharing this
+        scraper's connection pool and result cache across routes.
+        """
+        routes = list(routes)
+        if not routes:
+            return []
+
+        def search_route(route):
+            return self.search_flights_all_sites(
+                route['origin'],
+                route['destination'],
+                route['date'],
+                route.get('return_date'),
+                route.get('adults', 1),
+            )
+
+        with ThreadPoolExecutor(max_workers=min(4, len(routes))) as executor:
+            return list(executor.map(search_route, routes))
+
 
 # Example usage
 if __name__ == "__main__":
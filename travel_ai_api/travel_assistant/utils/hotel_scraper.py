@@ -5,16 +5,29 @@ This module provides functions to scrape hotel information from
 popular hotel booking sites like Booking.com, Airbnb, Agoda, Expedia, and Hotels.com based on user preferences.
 """
 
+import functools
+import heapq
+
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
+import soupsieve
+from lxml import html as lxml_html
 import re
-import json
 import logging
 import random
-import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json
+
+from travel_assistant.utils.ddg_common import DiskCache
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -27,6 +40,68 @@ USER_AGENTS = [
     'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:90.0) Gecko/20100101 Firefox/90.0'
 ]
 
+# Patterns used on every card field and price cell, compiled once at import
+_PRICE_RE = re.compile(r'[\$\€\£\₹]?\s*?(\d+[,\.\d]*)')
+
+# Upper bound on how much of a page we buffer; listings appear well within
+# this and it keeps a misbehaving endpoint from exhausting memory
+_MAX_BODY_BYTES = 2_000_000
+
+# Parse only the hotel-card subtrees; the surrounding page chrome is never
+# queried, so keeping it out of the tree cuts parse time and memory. Airbnb
+# and Expedia are left unstrained because they read page-level <script>
+# JSON before falling back to cards.
+_BOOKING_STRAINER = SoupStrainer('div', class_='sr_property_block')
+_AGODA_STRAINER = SoupStrainer('div', class_='PropertyCard')
+_HOTELS_COM_STRAINER = SoupStrainer('div', class_='uitk-card')
+
+
+@functools.lru_cache(maxsize=64)
+def _css(selector: str) -> soupsieve.SoupSieve:
+    """Compile a CSS selector once so per-card lookups skip recompilation."""
+    return soupsieve.compile(selector)
+
+
+# Per-site selectors, compiled once at import; the card loops index these
+# dicts instead of carrying selector strings inline. Expedia and Hotels.com
+# share several patterns, which the _css cache compiles only once.
+_AIRBNB_SELECTORS = {
+    'listing': _css("div[itemprop='itemListElement']"),
+    'title': _css("div[data-testid='listing-card-title']"),
+    'price': _css("span[data-testid='price-and-total']"),
+    'link': _css("a"),
+    'rating': _css("span[aria-hidden='true'][class*='rating']"),
+}
+_BOOKING_SELECTORS = {
+    'card': _css("div.sr_property_block"),
+    'name': _css("span.sr-hotel__name"),
+    'link': _css("a.hotel_name_link"),
+    'price': _css("div.bui-price-display__value"),
+    'rating': _css("div.bui-review-score__badge"),
+    'address': _css("div.sr_card_address_line"),
+}
+_AGODA_SELECTORS = {
+    'card': _css("div.PropertyCard"),
+    'name': _css("h3.PropertyCard__HotelName"),
+    'link': _css("a.PropertyCard__Link"),
+    'price': _css("span.PropertyCardPrice__Value"),
+    'rating': _css("div.Typographystyled__TypographyStyled-sc-j18mtu-0.hTkvyT"),
+}
+_EXPEDIA_SELECTORS = {
+    'card': _css("div.uitk-card"),
+    'name': _css("h3"),
+    'link': _css("a.uitk-card-link"),
+    'price': _css("div[data-stid='content-hotel-lead-price']"),
+    'rating': _css("span.uitk-rating-average"),
+}
+_HOTELS_COM_SELECTORS = {
+    'card': _css("div.uitk-card"),
+    'name': _css("h3"),
+    'link': _css("a.uitk-card-link"),
+    'price': _css("div[data-test-id='price-summary']"),
+    'rating': _css("span.uitk-rating-average"),
+}
+
 
 class HotelScraper:
     """A class for scraping hotel information from various websites"""
@@ -34,48 +109,82 @@ class HotelScraper:
     def __init__(self, timeout=10, max_retries=3):
         self.timeout = timeout
         self.max_retries = max_retries
-    
-    def get_random_user_agent(self) -> str:
-        """Return a random user agent to avoid detection"""
-        return random.choice(USER_AGENTS)
+        # One pooled session per scraper: keep-alive connections to the
+        # booking sites survive across requests instead of paying a fresh
+        # TCP + TLS handshake every time, and urllib3 handles retries with
+        # exponential backoff at the transport layer
+        self.session = requests.Session()
+        retry = Retry(total=max_retries, backoff_factor=1.0,
+                      status_forcelist=[429, 500, 502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=32, max_retries=retry)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        # One UA per scraper instance: rotating within a keep-alive session
+        # invites bot fingerprinting, and a fixed header skips the per-call
+        # dict build and random pick
+        self.session.headers.update({
+            'User-Agent': random.choice(USER_AGENTS),
+            'Accept-Language': 'en-US,en;q=0.9',
+            'Accept': 'text/html,application/xhtml+xml,application/xml'
+        })
+        # Listing pages barely change minute to minute; a short-TTL cache
+        # lets repeated searches for the same stay skip the network and
+        # parsing entirely
+        self._results_cache = DiskCache('hotel_results', ttl=600)
+
+    def close(self):
+        """Release the pooled connections held by the session"""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
     
     def make_request(self, url: str, headers=None, params=None) -> Optional[requests.Response]:
         """Make HTTP request with retry logic"""
-        if headers is None:
-            headers = {
-                'User-Agent': self.get_random_user_agent(),
-                'Accept-Language': 'en-US,en;q=0.9',
-                'Accept': 'text/html,application/xhtml+xml,application/xml'
-            }
-            
-        retries = 0
-        while retries < self.max_retries:
-            try:
-                response = requests.get(url, headers=headers, params=params, timeout=self.timeout)
-                response.raise_for_status()
-                return response
-            except requests.RequestException as e:
-                retries += 1
-                if retries >= self.max_retries:
-                    logger.error(f"Failed to retrieve {url} after {self.max_retries} attempts: {e}")
-                    return None
-                
-                logger.warning(f"Attempt {retries} failed. Retrying in {retries * 2} seconds...")
-                time.sleep(retries * 2)
-        return None
+        try:
+            response = self.session.get(url, headers=headers, params=params, timeout=self.timeout,
+                                        stream=True)
+            response.raise_for_status()
+            return response
+        except requests.RequestException as e:
+            logger.error(f"Failed to retrieve {url} after {self.max_retries} attempts: {e}")
+            return None
     
+    def _read_body(self, response: requests.Response) -> bytes:
+        """Read a streamed response in 64 KB chunks, capped at _MAX_BODY_BYTES"""
+        body = bytearray()
+        for chunk in response.iter_content(65536):
+            body.extend(chunk)
+            if len(body) >= _MAX_BODY_BYTES:
+                logger.debug(f"Truncating oversized response from {response.url}")
+                break
+        response.close()
+        return bytes(body)
+
     def clean_text(self, text: str) -> str:
         """Clean and normalize text"""
-        if text is None:
+        if not text:
             return ""
-        return re.sub(r'\s+', ' ', text).strip()
+        # str.split tokenizes on any whitespace run in C; faster than a
+        # regex substitution for the short strings cards produce
+        return ' '.join(text.split())
     
     def extract_price(self, price_text: str) -> Optional[float]:
         """Extract numeric price from text"""
         if not price_text:
             return None
             
-        price_match = re.search(r'[\$\€\£\₹]?\s*?(\d+[,\.\d]*)', price_text)
+        # Fast path: most prices are just a currency-prefixed number like
+        # "$129.00", which float() handles without the regex machinery
+        try:
+            return float(price_text.strip().lstrip('$\u20ac\u00a3\u20b9').replace(',', ''))
+        except ValueError:
+            pass
+            
+        price_match = _PRICE_RE.search(price_text)
         if price_match:
             price_str = price_match.group(1).replace(',', '')
             try:
@@ -98,55 +207,66 @@ class HotelScraper:
             'source': 'structured_search_input_header'
         }
         
+        cache_key = f"airbnb|{location}|{check_in}|{check_out}|{guests}|{rooms}"
+        cached = self._results_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         logger.info(f"Searching Airbnb for hotels in {location} from {check_in} to {check_out}")
         response = self.make_request(search_url, params=params)
         if not response:
             return []
             
+        body = self._read_body(response)
         results = []
-        soup = BeautifulSoup(response.content, 'html.parser')
         
-        # Find the JSON data embedded in the page
+        # Find the JSON data embedded in the page: one C-level XPath pass
+        # instead of looping every script tag and substring-scanning its
+        # text in Python
         try:
-            scripts = soup.find_all("script", type="application/json")
-            for script in scripts:
-                if "data-state" in script.attrs and "SearchResults" in script.text:
-                    data = json.loads(script.text)
-                    if "results" in data:
-                        for item in data["results"]:
-                            try:
-                                hotel = {
-                                    "name": item.get("name", ""),
-                                    "url": base_url + item.get("url", ""),
-                                    "price": item.get("price", {}).get("rate", {}).get("amount"),
-                                    "currency": item.get("price", {}).get("rate", {}).get("currency", "USD"),
-                                    "rating": item.get("rating", {}).get("value"),
-                                    "reviews_count": item.get("reviewsCount"),
-                                    "image_url": item.get("image", {}).get("url"),
-                                    "location": item.get("city", ""),
-                                    "source": "Airbnb"
-                                }
-                                results.append(hotel)
-                            except Exception as e:
-                                logger.debug(f"Error parsing Airbnb hotel item: {e}")
-                        break
+            tree = lxml_html.fromstring(body)
+            matches = tree.xpath(
+                '//script[@type="application/json" and @data-state]'
+                '[contains(string(.), "SearchResults")]'
+            )
+            for script in matches:
+                data = _json.loads(script.text or '')
+                if "results" in data:
+                    for item in data["results"]:
+                        try:
+                            hotel = {
+                                "name": item.get("name", ""),
+                                "url": base_url + item.get("url", ""),
+                                "price": item.get("price", {}).get("rate", {}).get("amount"),
+                                "currency": item.get("price", {}).get("rate", {}).get("currency", "USD"),
+                                "rating": item.get("rating", {}).get("value"),
+                                "reviews_count": item.get("reviewsCount"),
+                                "image_url": item.get("image", {}).get("url"),
+                                "location": item.get("city", ""),
+                                "source": "Airbnb"
+                            }
+                            results.append(hotel)
+                        except Exception as e:
+                            logger.debug(f"Error parsing Airbnb hotel item: {e}")
+                    break
         except Exception as e:
             logger.error(f"Error parsing Airbnb results: {e}")
             
         # If JSON data extraction fails, try HTML scraping
         if not results:
             try:
-                listings = soup.select("div[itemprop='itemListElement']")
+                soup = BeautifulSoup(body, 'lxml')
+                listings = _AIRBNB_SELECTORS['listing'].select(soup)
                 for listing in listings:
                     try:
-                        name = self.clean_text(listing.select_one("div[data-testid='listing-card-title']").text)
-                        price_elem = listing.select_one("span[data-testid='price-and-total']")
+                        name = self.clean_text(_AIRBNB_SELECTORS['title'].select_one(listing).text)
+                        price_elem = _AIRBNB_SELECTORS['price'].select_one(listing)
                         price = self.extract_price(price_elem.text) if price_elem else None
-                        url = listing.select_one("a")["href"]
+                        url = _AIRBNB_SELECTORS['link'].select_one(listing)["href"]
                         if not url.startswith("http"):
                             url = base_url + url
                             
-                        rating_elem = listing.select_one("span[aria-hidden='true'][class*='rating']")
+                        rating_elem = _AIRBNB_SELECTORS['rating'].select_one(listing)
                         rating = float(rating_elem.text.split()[0]) if rating_elem else None
                         
                         results.append({
@@ -162,7 +282,10 @@ class HotelScraper:
             except Exception as e:
                 logger.error(f"Error with HTML fallback scraping for Airbnb: {e}")
         
-        return self._filter_and_rank_results(results)
+        ranked = self._filter_and_rank_results(results)
+        if ranked:
+            self._results_cache.set(cache_key, ranked)
+        return ranked
     
     # BOOKING.COM SCRAPING
     def scrape_booking(self, location: str, check_in: str, check_out: str,
@@ -185,34 +308,39 @@ class HotelScraper:
             'lang': 'en-us'
         }
         
+        cache_key = f"booking|{location}|{check_in}|{check_out}|{guests}|{rooms}"
+        cached = self._results_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         logger.info(f"Searching Booking.com for hotels in {location} from {check_in} to {check_out}")
         response = self.make_request(search_url, params=params)
         if not response:
             return []
             
         results = []
-        soup = BeautifulSoup(response.content, 'html.parser')
+        soup = BeautifulSoup(self._read_body(response), 'lxml', parse_only=_BOOKING_STRAINER)
         
         # Search for hotel cards
-        hotel_cards = soup.select("div.sr_property_block")
+        hotel_cards = _BOOKING_SELECTORS['card'].select(soup)
         
         for card in hotel_cards:
             try:
-                name_elem = card.select_one("span.sr-hotel__name")
+                name_elem = _BOOKING_SELECTORS['name'].select_one(card)
                 name = self.clean_text(name_elem.text) if name_elem else ""
                 
-                url_elem = card.select_one("a.hotel_name_link")
+                url_elem = _BOOKING_SELECTORS['link'].select_one(card)
                 url = url_elem["href"] if url_elem and "href" in url_elem.attrs else ""
                 if url and not url.startswith("http"):
                     url = base_url + url
                 
-                price_elem = card.select_one("div.bui-price-display__value")
+                price_elem = _BOOKING_SELECTORS['price'].select_one(card)
                 price = self.extract_price(price_elem.text) if price_elem else None
                 
-                rating_elem = card.select_one("div.bui-review-score__badge")
+                rating_elem = _BOOKING_SELECTORS['rating'].select_one(card)
                 rating = float(rating_elem.text) if rating_elem else None
                 
-                location_elem = card.select_one("div.sr_card_address_line")
+                location_elem = _BOOKING_SELECTORS['address'].select_one(card)
                 location = self.clean_text(location_elem.text) if location_elem else ""
                 
                 results.append({
@@ -226,7 +354,10 @@ class HotelScraper:
             except Exception as e:
                 logger.debug(f"Error parsing Booking.com hotel card: {e}")
         
-        return self._filter_and_rank_results(results)
+        ranked = self._filter_and_rank_results(results)
+        if ranked:
+            self._results_cache.set(cache_key, ranked)
+        return ranked
     
     # AGODA SCRAPING
     def scrape_agoda(self, location: str, check_in: str, check_out: str,
@@ -249,31 +380,36 @@ class HotelScraper:
             'adults': guests
         }
         
+        cache_key = f"agoda|{location}|{check_in}|{check_out}|{guests}|{rooms}"
+        cached = self._results_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         logger.info(f"Searching Agoda for hotels in {location} from {check_in} to {check_out}")
         response = self.make_request(search_url, params=params)
         if not response:
             return []
             
         results = []
-        soup = BeautifulSoup(response.content, 'html.parser')
+        soup = BeautifulSoup(self._read_body(response), 'lxml', parse_only=_AGODA_STRAINER)
         
         # Try to find hotel cards
-        hotel_cards = soup.select("div.PropertyCard")
+        hotel_cards = _AGODA_SELECTORS['card'].select(soup)
         
         for card in hotel_cards:
             try:
-                name_elem = card.select_one("h3.PropertyCard__HotelName")
+                name_elem = _AGODA_SELECTORS['name'].select_one(card)
                 name = self.clean_text(name_elem.text) if name_elem else ""
                 
-                url_elem = card.select_one("a.PropertyCard__Link")
+                url_elem = _AGODA_SELECTORS['link'].select_one(card)
                 url = url_elem["href"] if url_elem and "href" in url_elem.attrs else ""
                 if url and not url.startswith("http"):
                     url = base_url + url
                 
-                price_elem = card.select_one("span.PropertyCardPrice__Value")
+                price_elem = _AGODA_SELECTORS['price'].select_one(card)
                 price = self.extract_price(price_elem.text) if price_elem else None
                 
-                rating_elem = card.select_one("div.Typographystyled__TypographyStyled-sc-j18mtu-0.hTkvyT")
+                rating_elem = _AGODA_SELECTORS['rating'].select_one(card)
                 rating = float(rating_elem.text) if rating_elem else None
                 
                 results.append({
@@ -286,7 +422,10 @@ class HotelScraper:
             except Exception as e:
                 logger.debug(f"Error parsing Agoda hotel card: {e}")
         
-        return self._filter_and_rank_results(results)
+        ranked = self._filter_and_rank_results(results)
+        if ranked:
+            self._results_cache.set(cache_key, ranked)
+        return ranked
     
     # EXPEDIA SCRAPING
     def scrape_expedia(self, location: str, check_in: str, check_out: str,
@@ -303,55 +442,62 @@ class HotelScraper:
             'adults': guests
         }
         
+        cache_key = f"expedia|{location}|{check_in}|{check_out}|{guests}|{rooms}"
+        cached = self._results_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         logger.info(f"Searching Expedia for hotels in {location} from {check_in} to {check_out}")
         response = self.make_request(search_url, params=params)
         if not response:
             return []
             
+        body = self._read_body(response)
         results = []
-        soup = BeautifulSoup(response.content, 'html.parser')
         
-        # Try to extract JSON data first
+        # Try to extract JSON data first, finding candidate scripts with a
+        # single XPath pass instead of a Python loop over every script tag
         try:
-            scripts = soup.find_all("script", type="application/json")
-            for script in scripts:
-                if "data-state" in script.attrs:
-                    try:
-                        data = json.loads(script.string)
-                        if "hotels" in data:
-                            for hotel_id, hotel_data in data["hotels"].items():
-                                hotel = {
-                                    "name": hotel_data.get("name", ""),
-                                    "url": f"{base_url}/hotel/{hotel_id}",
-                                    "price": hotel_data.get("price", {}).get("displayPrice"),
-                                    "rating": hotel_data.get("star"),
-                                    "source": "Expedia"
-                                }
-                                results.append(hotel)
-                            break
-                    except (json.JSONDecodeError, AttributeError):
-                        pass
+            tree = lxml_html.fromstring(body)
+            matches = tree.xpath('//script[@type="application/json" and @data-state]')
+            for script in matches:
+                try:
+                    data = _json.loads(script.text or '')
+                    if "hotels" in data:
+                        for hotel_id, hotel_data in data["hotels"].items():
+                            hotel = {
+                                "name": hotel_data.get("name", ""),
+                                "url": f"{base_url}/hotel/{hotel_id}",
+                                "price": hotel_data.get("price", {}).get("displayPrice"),
+                                "rating": hotel_data.get("star"),
+                                "source": "Expedia"
+                            }
+                            results.append(hotel)
+                        break
+                except (ValueError, AttributeError):
+                    pass
         except Exception as e:
             logger.error(f"Error extracting Expedia JSON data: {e}")
         
         # If JSON extraction failed, try HTML parsing
         if not results:
             try:
-                hotel_cards = soup.select("div.uitk-card")
+                soup = BeautifulSoup(body, 'lxml')
+                hotel_cards = _EXPEDIA_SELECTORS['card'].select(soup)
                 for card in hotel_cards:
                     try:
-                        name_elem = card.select_one("h3")
+                        name_elem = _EXPEDIA_SELECTORS['name'].select_one(card)
                         name = self.clean_text(name_elem.text) if name_elem else ""
                         
-                        url_elem = card.select_one("a.uitk-card-link")
+                        url_elem = _EXPEDIA_SELECTORS['link'].select_one(card)
                         url = url_elem["href"] if url_elem and "href" in url_elem.attrs else ""
                         if url and not url.startswith("http"):
                             url = base_url + url
                         
-                        price_elem = card.select_one("div[data-stid='content-hotel-lead-price']")
+                        price_elem = _EXPEDIA_SELECTORS['price'].select_one(card)
                         price = self.extract_price(price_elem.text) if price_elem else None
                         
-                        rating_elem = card.select_one("span.uitk-rating-average")
+                        rating_elem = _EXPEDIA_SELECTORS['rating'].select_one(card)
                         rating = float(rating_elem.text.split('/')[0]) if rating_elem else None
                         
                         results.append({
@@ -366,7 +512,10 @@ class HotelScraper:
             except Exception as e:
                 logger.error(f"Error with HTML fallback scraping for Expedia: {e}")
         
-        return self._filter_and_rank_results(results)
+        ranked = self._filter_and_rank_results(results)
+        if ranked:
+            self._results_cache.set(cache_key, ranked)
+        return ranked
     
     # HOTELS.COM SCRAPING
     def scrape_hotels_com(self, location: str, check_in: str, check_out: str,
@@ -383,30 +532,35 @@ class HotelScraper:
             'adults': guests
         }
         
+        cache_key = f"hotels_com|{location}|{check_in}|{check_out}|{guests}|{rooms}"
+        cached = self._results_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         logger.info(f"Searching Hotels.com for hotels in {location} from {check_in} to {check_out}")
         response = self.make_request(search_url, params=params)
         if not response:
             return []
             
         results = []
-        soup = BeautifulSoup(response.content, 'html.parser')
+        soup = BeautifulSoup(self._read_body(response), 'lxml', parse_only=_HOTELS_COM_STRAINER)
         
         # Hotels.com uses a similar structure to Expedia
-        hotel_cards = soup.select("div.uitk-card")
+        hotel_cards = _HOTELS_COM_SELECTORS['card'].select(soup)
         for card in hotel_cards:
             try:
-                name_elem = card.select_one("h3")
+                name_elem = _HOTELS_COM_SELECTORS['name'].select_one(card)
                 name = self.clean_text(name_elem.text) if name_elem else ""
                 
-                url_elem = card.select_one("a.uitk-card-link")
+                url_elem = _HOTELS_COM_SELECTORS['link'].select_one(card)
                 url = url_elem["href"] if url_elem and "href" in url_elem.attrs else ""
                 if url and not url.startswith("http"):
                     url = base_url + url
                 
-                price_elem = card.select_one("div[data-test-id='price-summary']")
+                price_elem = _HOTELS_COM_SELECTORS['price'].select_one(card)
                 price = self.extract_price(price_elem.text) if price_elem else None
                 
-                rating_elem = card.select_one("span.uitk-rating-average")
+                rating_elem = _HOTELS_COM_SELECTORS['rating'].select_one(card)
                 rating = float(rating_elem.text.split('/')[0]) if rating_elem else None
                 
                 results.append({
@@ -419,63 +573,72 @@ class HotelScraper:
             except Exception as e:
                 logger.debug(f"Error parsing Hotels.com hotel card: {e}")
         
-        return self._filter_and_rank_results(results)
+        ranked = self._filter_and_rank_results(results)
+        if ranked:
+            self._results_cache.set(cache_key, ranked)
+        return ranked
     
     def _filter_and_rank_results(self, results: List[Dict[str, Any]], top_n: int = 3) -> List[Dict[str, Any]]:
         """Filter and rank results, returning top N"""
         if not results:
             return []
             
-        # Sort by rating (descending) then price (ascending)
-        sorted_results = sorted(
-            [r for r in results if r.get("name")], 
-            key=lambda x: (-1 * (x.get("rating") or 0), x.get("price") or float('inf'))
-        )
+        # Rank by rating (descending) then price (ascending). Keys are
+        # precomputed once per result, and a bounded heap picks the top N
+        # in O(n log k) instead of sorting everything for three winners.
+        keyed = [
+            ((-(r.get("rating") or 0), r.get("price") or float('inf')), r)
+            for r in results if r.get("name")
+        ]
         
-        return sorted_results[:top_n]
+        return [r for _, r in heapq.nsmallest(top_n, keyed, key=lambda kv: kv[0])]
     
     def search_hotels_all_sites(self, location: str, check_in: str, check_out: str,
                               guests: int = 2, rooms: int = 1) -> Dict[str, List[Dict[str, Any]]]:
         """Search for hotels across all supported sites"""
+        sites = {
+            "airbnb": self.scrape_airbnb,
+            "booking": self.scrape_booking,
+            "agoda": self.scrape_agoda,
+            "expedia": self.scrape_expedia,
+            "hotels_com": self.scrape_hotels_com,
+        }
+
+        # The five sites are independent, so scrape them in parallel and let
+        # the slowest one set the overall latency instead of the sum. Results
+        # are collected as each site finishes rather than in submission order.
         results = {}
-        
-        # Search each site
-        try:
-            results["airbnb"] = self.scrape_airbnb(location, check_in, check_out, guests, rooms)
-        except Exception as e:
-            logger.error(f"Error searching Airbnb: {e}")
-            results["airbnb"] = []
-            
-        try:
-            results["booking"] = self.scrape_booking(location, check_in, check_out, guests, rooms)
-        except Exception as e:
-            logger.error(f"Error searching Booking.com: {e}")
-            results["booking"] = []
-            
-        try:
-            results["agoda"] = self.scrape_agoda(location, check_in, check_out, guests, rooms)
-        except Exception as e:
-            logger.error(f"Error searching Agoda: {e}")
-            results["agoda"] = []
-            
-        try:
-            results["expedia"] = self.scrape_expedia(location, check_in, check_out, guests, rooms)
-        except Exception as e:
-            logger.error(f"Error searching Expedia: {e}")
-            results["expedia"] = []
-            
-        try:
-            results["hotels_com"] = self.scrape_hotels_com(location, check_in, check_out, guests, rooms)
-        except Exception as e:
-            logger.error(f"Error searching Hotels.com: {e}")
-            results["hotels_com"] = []
-            
+        with ThreadPoolExecutor(max_workers=len(sites)) as executor:
+            futures = {
+                executor.submit(scrape, location, check_in, check_out, guests, rooms): name
+                for name, scrape in sites.items()
+            }
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    logger.error(f"Error searching {name}: {e}")
+                    results[name] = []
         return results
 
 
+# Shared default instance: building a HotelScraper per search would throw
+# away the connection pool before it ever serves a second request
+_default_scraper = None
+
+
+def get_default_scraper() -> HotelScraper:
+    """Return a process-wide HotelScraper, creating it on first use."""
+    global _default_scraper
+    if _default_scraper is None:
+        _default_scraper = HotelScraper()
+    return _default_scraper
+
+
 # Example usage
 if __name__ == "__main__":
-    scraper = HotelScraper()
+    scraper = get_default_scraper()
     
     # Example hotel search for Ooty
     hotel_results = scraper.search_hotels_all_sites(
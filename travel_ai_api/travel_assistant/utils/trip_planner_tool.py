@@ -14,7 +14,7 @@ from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional, Union
 
 # Import the various scrapers
-from .hotel_scraper import HotelScraper
+from .hotel_scraper import get_default_scraper
 from .flight_scraper import FlightScraper
 from .activity_scraper import ActivityScraper
 from .travel_info_scraper import TravelInfoScraper
@@ -375,8 +375,8 @@ def get_accommodation_options(
     
     # 2. Fallback to scrapers
     try:
-        # Initialize scraper and search for accommodations
-        scraper = HotelScraper()
+        # Use the shared scraper so its pool and cache survive searches
+        scraper = get_default_scraper()
         all_results = scraper.search_hotels_all_sites(
             location=location,
             check_in=check_in,
@@ -1,7 +1,7 @@
 from typing import List, Dict, Any, Optional
 from duckduckgo_search import DDGS
 from datetime import datetime, timedelta
-from .hotel_scraper import HotelScraper
+from .hotel_scraper import get_default_scraper
 from .flight_scraper import FlightScraper
 
 class WebSearchClient:
@@ -11,7 +11,7 @@ class WebSearchClient:
     def __init__(self):
         """Initialize the search clients"""
         self.ddgs = DDGS()
-        self.hotel_scraper = HotelScraper()
+        self.hotel_scraper = get_default_scraper()
         self.flight_scraper = FlightScraper()
     
     def search_travel_info(self, query: str, max_results: int = 5) -> List[Dict[str, Any]]:
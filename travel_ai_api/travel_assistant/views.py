@@ -23,7 +23,7 @@ from .serializers import (
 )
 from .utils.openai_client import OpenAIClient
 from .utils.web_search import WebSearchClient
-from .utils.hotel_scraper import HotelScraper
+from .utils.hotel_scraper import get_default_scraper
 from .utils.flight_scraper import FlightScraper
 
 
@@ -517,8 +517,9 @@ class TravelScraperView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Perform the scraping
-        scraper = HotelScraper()
+        # Perform the scraping; the shared scraper keeps its connection
+        # pool and result cache warm across API requests
+        scraper = get_default_scraper()
         hotel_results = scraper.search_hotels_all_sites(
             location=location,
             check_in=check_in,